@@ -1,12 +1,16 @@
 from datetime import datetime, timedelta
 from typing import Optional
+from collections import OrderedDict
 import os
+import threading
+import time
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy import text
-from db import engine, SessionLocal
+from sqlalchemy import select
+from db import read_engine
+from models import User
 
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = "HS256"
@@ -16,6 +20,36 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 security = HTTPBearer()
 
+_USER_CACHE_TTL = 60
+_USER_CACHE_MAX = 1024
+_user_cache: "OrderedDict[str, tuple[float, dict]]" = OrderedDict()
+_user_cache_lock = threading.Lock()
+
+def _get_cached_user(token: str) -> Optional[dict]:
+    with _user_cache_lock:
+        entry = _user_cache.get(token)
+        if entry is None:
+            return None
+        expires_at, user = entry
+        if expires_at < time.monotonic():
+            del _user_cache[token]
+            return None
+        _user_cache.move_to_end(token)
+        return user
+
+def _cache_user(token: str, user: dict, token_exp: Optional[float]):
+    ttl = _USER_CACHE_TTL
+    if token_exp is not None:
+        # Never serve a cached user past the token's own expiry
+        ttl = min(ttl, token_exp - time.time())
+    if ttl <= 0:
+        return
+    with _user_cache_lock:
+        _user_cache[token] = (time.monotonic() + ttl, user)
+        _user_cache.move_to_end(token)
+        if len(_user_cache) > _USER_CACHE_MAX:
+            _user_cache.popitem(last=False)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
@@ -33,15 +67,13 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 def get_user_by_email(email: str):
-    db = SessionLocal()
-    try:
-        result = db.execute(
-            text("SELECT id, email, password_hash, created_at FROM users WHERE LOWER(email) = LOWER(:email)"),
-            {"email": email.strip()}
+    with read_engine.connect() as conn:
+        # Emails are stored lowercased, so an equality match can use the unique index
+        result = conn.execute(
+            select(User.id, User.email, User.password_hash, User.created_at)
+            .where(User.email == email.strip().lower())
         ).mappings().first()
         return dict(result) if result else None
-    finally:
-        db.close()
 
 def authenticate_user(email: str, password: str):
     user = get_user_by_email(email)
@@ -57,8 +89,12 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    token = credentials.credentials
+    cached = _get_cached_user(token)
+    if cached is not None:
+        return cached
+    
     try:
-        token = credentials.credentials
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
         if email is None:
@@ -69,4 +105,5 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
     user = get_user_by_email(email)
     if user is None:
         raise credentials_exception
+    _cache_user(token, user, payload.get("exp"))
     return user
@@ -0,0 +1,116 @@
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+
+from db import SessionLocal
+from models import Bookmark, YouTubeDetails
+
+logger = logging.getLogger(__name__)
+
+QUEUE_SIZE = 256
+BATCH = 64
+
+_STOP = object()
+
+_Item = Tuple[Dict[str, Any], Optional[Dict[str, Any]], Future]
+
+class BookmarkWriter:
+
+    def __init__(self, format_response: Callable[[Bookmark], Dict[str, Any]], maxsize: int = QUEUE_SIZE, batch_size: int = BATCH):
+        self._format_response = format_response
+        self._queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        self._batch_size = batch_size
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, row: Dict[str, Any], youtube_details: Optional[Dict[str, Any]] = None) -> Future:
+        self._ensure_started()
+        future = Future()
+        # Blocks when the queue is full so memory stays bounded under load
+        self._queue.put((row, youtube_details, future))
+        return future
+
+    def close(self, timeout: Optional[float] = None):
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is None:
+            return
+        self._queue.put(_STOP)
+        thread.join(timeout)
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="bookmark_writer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+
+            batch = [item]
+            stop = False
+            while len(batch) < self._batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+
+            self._write(batch)
+            if stop:
+                return
+
+    def _write(self, batch: List[_Item]):
+        try:
+            self._write_batch(batch)
+        except IntegrityError as e:
+            if len(batch) > 1:
+                # Isolate the conflicting row so the rest of the batch still lands
+                for item in batch:
+                    self._write([item])
+                return
+            future = batch[0][2]
+            if "unique constraint" in str(e).lower():
+                future.set_exception(ValueError("You already have this link bookmarked! Check your existing bookmarks to find it."))
+            else:
+                future.set_exception(RuntimeError(f"Database error: {str(e)}"))
+        except Exception as e:
+            logger.error(f"Bookmark writer failed on a batch of {len(batch)}: {e}")
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(RuntimeError(f"Database error: {str(e)}"))
+
+    def _write_batch(self, batch: List[_Item]):
+        with SessionLocal() as session:
+            bookmarks = list(session.scalars(
+                insert(Bookmark).returning(Bookmark, sort_by_parameter_order=True),
+                [row for row, _, _ in batch]
+            ))
+
+            details_rows = [
+                dict(details, bookmark_id=bookmark.id)
+                for bookmark, (_, details, _) in zip(bookmarks, batch)
+                if details
+            ]
+            if details_rows:
+                session.execute(insert(YouTubeDetails), details_rows)
+
+            responses = [self._format_response(bookmark) for bookmark in bookmarks]
+            session.commit()
+
+        for response, (_, _, future) in zip(responses, batch):
+            future.set_result(response)
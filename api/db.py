@@ -1,7 +1,8 @@
 import os
+import re
 from pathlib import Path
 import logging
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.exc import OperationalError
 from dotenv import load_dotenv
@@ -13,20 +14,42 @@ logger = logging.getLogger(__name__)
 ENV_PATH = Path(__file__).with_name(".env")
 load_dotenv(dotenv_path=ENV_PATH)
 
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./bookmarks.db")
+# Anchored to this file so the default database doesn't depend on the process cwd
+DEFAULT_DATABASE_URL = f"sqlite:///{Path(__file__).resolve().with_name('bookmarks.db')}"
+DATABASE_URL = os.getenv("DATABASE_URL", DEFAULT_DATABASE_URL)
 
 if DATABASE_URL.startswith("postgresql"):
     engine = create_engine(
         DATABASE_URL,
         pool_pre_ping=True,
-        pool_size=10,
-        max_overflow=20,
+        pool_size=20,
+        max_overflow=40,
+        query_cache_size=1200,
+        insertmanyvalues_page_size=1000,
         echo=os.getenv("DEBUG", "").lower() == "true"
     )
 else:
-    engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+    engine = create_engine(DATABASE_URL, pool_pre_ping=True, query_cache_size=1200, insertmanyvalues_page_size=1000)
+
+if DATABASE_URL.startswith("sqlite"):
+    @event.listens_for(engine, "connect")
+    def _sqlite_pragmas(dbapi_conn, _):
+        # WAL lets readers run alongside the writer instead of queueing behind the rollback journal
+        cursor = dbapi_conn.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA mmap_size=268435456")
+        cursor.execute("PRAGMA cache_size=-65536")
+        cursor.close()
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Plain SELECTs need no transaction: no BEGIN/COMMIT round trips and no lingering SQLite lock
+read_engine = engine.execution_options(isolation_level="AUTOCOMMIT")
+
+_SEARCH_COLUMNS = ("title", "author", "description", "note")
+_JSON_DEFAULT_COLUMNS = {"bookmarks": "raw", "youtube_details": "extra", "comments": "raw"}
+_fts_enabled = False
 
 def get_db() -> Session:
     db = SessionLocal()
@@ -53,6 +76,21 @@ def init_db():
         Base.metadata.create_all(bind=engine)
         logger.info("Database tables created successfully")
         
+        with engine.begin() as conn:
+            # Superseded by idx_bookmarks_user_platform_created
+            conn.execute(text("DROP INDEX IF EXISTS idx_bookmarks_platform_created_at"))
+            # Superseded by idx_bookmarks_user_created_desc
+            conn.execute(text("DROP INDEX IF EXISTS idx_bookmarks_user_created"))
+            conn.execute(text("DROP INDEX IF EXISTS idx_bookmarks_user_created_covering"))
+            # create_all skips indexes on tables that already exist, so backfill any declared since
+            for table in Base.metadata.sorted_tables:
+                for index in table.indexes:
+                    index.create(conn, checkfirst=True)
+            _add_json_server_defaults(conn)
+        
+        if DATABASE_URL.startswith("sqlite"):
+            _create_fts_table()
+        
         if DATABASE_URL.startswith("postgresql"):
             with engine.connect() as conn:
                 try:
@@ -62,30 +100,140 @@ def init_db():
                 except Exception as e:
                     logger.warning(f"Could not enable PostgreSQL extensions: {e}")
                 conn.commit()
+                _migrate_tags_to_jsonb(conn)
+                _create_trigram_indexes(conn)
                 
     except Exception as e:
         logger.error(f"Failed to initialize database: {e}")
         raise RuntimeError(f"Database initialization failed: {e}")
 
+def fts_enabled() -> bool:
+    return _fts_enabled
+
+def _create_fts_table():
+    global _fts_enabled
+    columns = ", ".join(_SEARCH_COLUMNS)
+    new_columns = ", ".join(f"new.{c}" for c in _SEARCH_COLUMNS)
+    old_columns = ", ".join(f"old.{c}" for c in _SEARCH_COLUMNS)
+    try:
+        with engine.begin() as conn:
+            exists = conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'bookmarks_fts'")).scalar()
+            conn.execute(text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS bookmarks_fts USING fts5({columns}, content='bookmarks', content_rowid='id')"
+            ))
+            conn.execute(text(
+                f"CREATE TRIGGER IF NOT EXISTS bookmarks_fts_ai AFTER INSERT ON bookmarks BEGIN "
+                f"INSERT INTO bookmarks_fts(rowid, {columns}) VALUES (new.id, {new_columns}); END"
+            ))
+            conn.execute(text(
+                f"CREATE TRIGGER IF NOT EXISTS bookmarks_fts_ad AFTER DELETE ON bookmarks BEGIN "
+                f"INSERT INTO bookmarks_fts(bookmarks_fts, rowid, {columns}) VALUES ('delete', old.id, {old_columns}); END"
+            ))
+            conn.execute(text(
+                f"CREATE TRIGGER IF NOT EXISTS bookmarks_fts_au AFTER UPDATE ON bookmarks BEGIN "
+                f"INSERT INTO bookmarks_fts(bookmarks_fts, rowid, {columns}) VALUES ('delete', old.id, {old_columns}); "
+                f"INSERT INTO bookmarks_fts(rowid, {columns}) VALUES (new.id, {new_columns}); END"
+            ))
+            if not exists:
+                # Index the rows that predate the FTS table
+                conn.execute(text("INSERT INTO bookmarks_fts(bookmarks_fts) VALUES ('rebuild')"))
+        _fts_enabled = True
+        logger.info("SQLite FTS5 search index ready")
+    except OperationalError as e:
+        logger.warning(f"FTS5 unavailable, bookmark search falls back to LIKE scans: {e}")
+
+def _create_trigram_indexes(conn):
+    try:
+        for column in _SEARCH_COLUMNS:
+            conn.execute(text(
+                f"CREATE INDEX IF NOT EXISTS idx_bookmarks_{column}_trgm ON bookmarks USING gin ({column} gin_trgm_ops)"
+            ))
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        logger.warning(f"Could not create trigram search indexes: {e}")
+
+def _add_json_server_defaults(conn):
+    # The models rely on a server-side '{}' for these columns, which tables created before it was declared lack
+    if DATABASE_URL.startswith("postgresql"):
+        for table, column in _JSON_DEFAULT_COLUMNS.items():
+            # ALTER takes an ACCESS EXCLUSIVE lock, so only issue it when the default is actually missing
+            default = conn.execute(text(
+                "SELECT column_default FROM information_schema.columns "
+                "WHERE table_name = :table AND column_name = :column"
+            ), {"table": table, "column": column}).scalar()
+            if default is None:
+                conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN {column} SET DEFAULT '{{}}'"))
+                logger.info(f"Added server default to {table}.{column}")
+        return
+    if not DATABASE_URL.startswith("sqlite"):
+        return
+    
+    missing = [
+        (table, column) for table, column in _JSON_DEFAULT_COLUMNS.items()
+        if any(
+            row["name"] == column and row["dflt_value"] is None
+            for row in conn.execute(text(f"PRAGMA table_info({table})")).mappings()
+        )
+    ]
+    if not missing:
+        return
+    
+    # SQLite has no ALTER COLUMN; rewriting the stored CREATE TABLE is its documented route for default-only changes
+    version = conn.execute(text("PRAGMA schema_version")).scalar()
+    conn.execute(text("PRAGMA writable_schema=ON"))
+    for table, column in missing:
+        sql = conn.execute(
+            text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": table}
+        ).scalar()
+        new_sql = re.sub(rf"(\b{column}\s+TEXT)\b", r"\1 DEFAULT '{}'", sql, count=1, flags=re.I)
+        if new_sql == sql:
+            logger.warning(f"Could not add a server default to {table}.{column}")
+            continue
+        conn.execute(
+            text("UPDATE sqlite_master SET sql = :sql WHERE type = 'table' AND name = :name"),
+            {"sql": new_sql, "name": table}
+        )
+        logger.info(f"Added server default to {table}.{column}")
+    conn.execute(text(f"PRAGMA schema_version={version + 1}"))
+    conn.execute(text("PRAGMA writable_schema=OFF"))
+
+def _migrate_tags_to_jsonb(conn):
+    data_type = conn.execute(text(
+        "SELECT data_type FROM information_schema.columns "
+        "WHERE table_name = 'youtube_details' AND column_name = 'tags'"
+    )).scalar()
+    if data_type == "text":
+        conn.execute(text("ALTER TABLE youtube_details ALTER COLUMN tags TYPE JSONB USING tags::jsonb"))
+        conn.commit()
+        logger.info("Migrated youtube_details.tags to JSONB")
+
+_SQLITE_ADDED_COLUMNS = {
+    "users": [
+        ("updated_at", "TIMESTAMP DEFAULT CURRENT_TIMESTAMP"),
+    ],
+    "bookmarks": [
+        ("author", "TEXT"),
+        ("thumbnail_url", "TEXT"),
+        ("description", "TEXT"),
+        ("note", "TEXT"),
+        ("published_at", "TIMESTAMP"),
+        ("updated_at", "TIMESTAMP DEFAULT CURRENT_TIMESTAMP"),
+    ],
+}
+
 def migrate_from_sqlite():
     if not DATABASE_URL.startswith("sqlite"):
         logger.info("Not using SQLite, skipping migration")
         return
     
     with engine.begin() as conn:
-        try:
-            conn.execute(text("ALTER TABLE users ADD COLUMN updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP"))
-        except:
-            pass
-        
-        try:
-            conn.execute(text("ALTER TABLE bookmarks ADD COLUMN author TEXT"))
-            conn.execute(text("ALTER TABLE bookmarks ADD COLUMN thumbnail_url TEXT"))
-            conn.execute(text("ALTER TABLE bookmarks ADD COLUMN description TEXT"))
-            conn.execute(text("ALTER TABLE bookmarks ADD COLUMN note TEXT"))
-            conn.execute(text("ALTER TABLE bookmarks ADD COLUMN published_at TIMESTAMP"))
-            conn.execute(text("ALTER TABLE bookmarks ADD COLUMN updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP"))
-        except:
-            pass
+        for table, columns in _SQLITE_ADDED_COLUMNS.items():
+            # Only ALTER for columns that are actually missing instead of trying each and swallowing the error
+            existing = {row["name"] for row in conn.execute(text(f"PRAGMA table_info({table})")).mappings()}
+            for column, ddl in columns:
+                if column not in existing:
+                    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+                    logger.info(f"Added {table}.{column}")
     
     logger.info("SQLite migration completed")
\ No newline at end of file
@@ -0,0 +1,22 @@
+import logging
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+CLIENT = httpx.AsyncClient(
+    http2=True,
+    timeout=5.0,
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+    follow_redirects=True,
+    headers={
+        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+        "Accept-Language": "en-US,en;q=0.5",
+    }
+)
+
+async def close_client():
+    if not CLIENT.is_closed:
+        await CLIENT.aclose()
+        logger.info("Shared HTTP client closed")
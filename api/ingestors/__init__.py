@@ -12,6 +12,7 @@ from .social import (
     SnapchatIngestor,
     FacebookIngestor
 )
+from .platforms import detect_platform
 from .registry import get_ingestor, add_bookmark
 
 __all__ = [
@@ -28,5 +29,6 @@ __all__ = [
     'SnapchatIngestor',
     'FacebookIngestor',
     'get_ingestor', 
-    'add_bookmark'
+    'add_bookmark',
+    'detect_platform'
 ] 
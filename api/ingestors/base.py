@@ -1,9 +1,12 @@
 from abc import ABC, abstractmethod
 from typing import Dict, Any, Optional
 from datetime import datetime
+from urllib.parse import urlparse
 
 class BaseIngestor(ABC):
     
+    __slots__ = ()
+    
     @property
     @abstractmethod
     def platform(self) -> str:
@@ -23,8 +26,7 @@ class BaseIngestor(ABC):
     
     def validate_url(self, url: str) -> bool:
         try:
-            from urllib.parse import urlparse
             result = urlparse(url)
             return all([result.scheme, result.netloc])
-        except:
+        except (ValueError, TypeError, AttributeError):
             return False 
\ No newline at end of file
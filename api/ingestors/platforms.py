@@ -0,0 +1,39 @@
+from functools import lru_cache
+from urllib.parse import urlsplit
+
+_HOST_MAP = {
+    "youtube.com": "youtube",
+    "youtu.be": "youtube",
+    "tiktok.com": "tiktok",
+    "instagram.com": "instagram",
+    "twitter.com": "twitter",
+    "x.com": "twitter",
+    "linkedin.com": "linkedin",
+    "reddit.com": "reddit",
+    "pinterest.com": "pinterest",
+    "pin.it": "pinterest",
+    "snapchat.com": "snapchat",
+    "facebook.com": "facebook",
+    "fb.com": "facebook",
+}
+
+@lru_cache(maxsize=4096)
+def platform_for_host(host: str) -> str:
+    while "." in host:
+        platform = _HOST_MAP.get(host)
+        if platform:
+            return platform
+        host = host.partition(".")[2]
+    return "other"
+
+def url_host(url: str) -> str:
+    try:
+        return urlsplit(url).hostname or ""
+    except ValueError:
+        return ""
+
+def detect_platform(url: str) -> str:
+    return platform_for_host(url_host(url))
+
+def platform_cache_info():
+    return platform_for_host.cache_info()
@@ -4,6 +4,7 @@ load_dotenv()
 import logging
 import json
 from typing import Dict, Any, Optional
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from .base import BaseIngestor
@@ -11,6 +12,7 @@ from .youtube import YouTubeIngestor
 from .tiktok_api import TikTokApiIngestor 
 from .tiktok import TikTokIngestor 
 from .instagram_api import InstagramApiIngestor
+from .platforms import detect_platform, platform_for_host, url_host
 from .social import (
     InstagramIngestor, 
     TwitterIngestor,
@@ -22,12 +24,20 @@ from .social import (
 )
 from models import Bookmark, YouTubeDetails, User
 from db import SessionLocal
+from bookmark_writer import BookmarkWriter
 import asyncio
 
 logger = logging.getLogger(__name__)
 
+def _redis_client():
+    redis_url = os.getenv("REDIS_URL")
+    if not redis_url:
+        return None
+    import redis
+    return redis.Redis.from_url(redis_url)
+
 INGESTORS = [
-    YouTubeIngestor(),
+    YouTubeIngestor(redis_client=_redis_client()),
     TikTokApiIngestor(), 
     TikTokIngestor(),   
     InstagramApiIngestor(username=os.getenv("IG_USERNAME"), password=os.getenv("IG_PASSWORD"), session_id=os.getenv("INSTAGRAM_SESSIONID")),
@@ -53,20 +63,22 @@ def get_tiktok_ingestors(url: str) -> list:
             tiktok_ingestors.append(ingestor)
     return tiktok_ingestors
 
-async def add_bookmark(url: str, user_id: int, db: Session = None) -> Dict[str, Any]:
+async def add_bookmark(url: str, user_id: int, db: Session = None, *, title: Optional[str] = None, note: Optional[str] = None, host: Optional[str] = None) -> Dict[str, Any]:
     should_close_db = False
     if db is None:
         db = SessionLocal()
         should_close_db = True
     
     try:
-        if "tiktok.com" in url.lower():
+        platform = platform_for_host(host if host is not None else url_host(url))
+        
+        if platform == "tiktok":
             tiktok_ingestors = get_tiktok_ingestors(url)
             if tiktok_ingestors:
                 for ingestor in tiktok_ingestors:
                     try:
                         logger.info(f"Trying {type(ingestor).__name__} for TikTok URL: {url}")
-                        return await _create_new_bookmark(ingestor, url, user_id, db)
+                        return await _create_new_bookmark(ingestor, url, user_id, db, title=title, note=note)
                     except Exception as e:
                         logger.warning(f"{type(ingestor).__name__} failed: {e}")
                         continue
@@ -76,17 +88,18 @@ async def add_bookmark(url: str, user_id: int, db: Session = None) -> Dict[str,
         
         if not ingestor:
             logger.info(f"No ingestor found for URL: {url}, creating basic bookmark")
-            return _create_basic_bookmark(url, user_id, db)
+            return _create_basic_bookmark(url, user_id, db, title=title, note=note, platform=platform)
         
         logger.info(f"Using {ingestor.platform} ingestor for URL: {url}")
         
-        existing = db.query(Bookmark).filter(Bookmark.url == url, Bookmark.user_id == user_id).first()
+        # Sync query, so keep it off the event loop like the extraction and the write
+        existing = await asyncio.to_thread(_bookmark_exists, db, url, user_id)
         
         if existing:
             logger.info(f"Bookmark already exists for URL: {url}")
             raise ValueError("You already have this link bookmarked! Check your existing bookmarks to find it.")
         else:
-            return await _create_new_bookmark(ingestor, url, user_id, db)
+            return await _create_new_bookmark(ingestor, url, user_id, db, title=title, note=note)
             
     except ValueError as e:
         logger.error(f"Validation error adding bookmark: {e}")
@@ -98,22 +111,20 @@ async def add_bookmark(url: str, user_id: int, db: Session = None) -> Dict[str,
         if should_close_db:
             db.close()
 
-def _create_basic_bookmark(url: str, user_id: int, db: Session) -> Dict[str, Any]:
+def _create_basic_bookmark(url: str, user_id: int, db: Session, *, title: Optional[str] = None, note: Optional[str] = None, platform: Optional[str] = None) -> Dict[str, Any]:
     try:
-        platform = _detect_platform(url)
+        platform = platform or detect_platform(url)
         
-        bookmark = Bookmark(
-            platform=platform,
-            url=url,
-            user_id=user_id,
-            raw='{}'
+        bookmark = db.scalar(
+            insert(Bookmark)
+            .values(platform=platform, url=url, title=title, note=note, user_id=user_id)
+            .returning(Bookmark)
         )
-        
-        db.add(bookmark)
+        # Format before commit so expire_on_commit does not trigger a reload
+        response = _format_bookmark_response(bookmark)
         db.commit()
-        db.refresh(bookmark)
         
-        return _format_bookmark_response(bookmark)
+        return response
         
     except IntegrityError as e:
         db.rollback()
@@ -121,43 +132,38 @@ def _create_basic_bookmark(url: str, user_id: int, db: Session) -> Dict[str, Any
             raise ValueError("You already have this link bookmarked! Check your existing bookmarks to find it.")
         raise RuntimeError(f"Database error: {str(e)}")
 
-async def _create_new_bookmark(ingestor: BaseIngestor, url: str, user_id: int, db: Session) -> Dict[str, Any]:
-    try:
-        if asyncio.iscoroutinefunction(ingestor.extract_metadata):
-            raw_data = await ingestor.extract_metadata(url)
-        else:
-            raw_data = ingestor.extract_metadata(url)
-        normalized = ingestor.normalize_metadata(raw_data)
-        
-        bookmark = Bookmark(
-            platform=ingestor.platform,
-            url=url,
-            title=normalized.get("title"),
-            author=normalized.get("author"),
-            thumbnail_url=normalized.get("thumbnail_url"),
-            description=normalized.get("description"),
-            published_at=normalized.get("published_at"),
-            user_id=user_id,
-            raw=json.dumps(raw_data, default=str)
-        )
-        
-        db.add(bookmark)
-        db.flush()
-        
-        if ingestor.platform == "youtube":
-            _create_youtube_details(bookmark.id, normalized["platform_specific"], db)
-        
-        db.commit()
-        db.refresh(bookmark)
-        
-        logger.info(f"Created new {ingestor.platform} bookmark: {bookmark.title}")
-        return _format_bookmark_response(bookmark)
-        
-    except IntegrityError as e:
-        db.rollback()
-        if "unique constraint" in str(e).lower():
-            raise ValueError("You already have this link bookmarked! Check your existing bookmarks to find it.")
-        raise RuntimeError(f"Database error: {str(e)}")
+def _bookmark_exists(db: Session, url: str, user_id: int) -> bool:
+    return db.query(Bookmark.id).filter(Bookmark.url == url, Bookmark.user_id == user_id).first() is not None
+
+async def _create_new_bookmark(ingestor: BaseIngestor, url: str, user_id: int, db: Session, *, title: Optional[str] = None, note: Optional[str] = None) -> Dict[str, Any]:
+    if asyncio.iscoroutinefunction(ingestor.extract_metadata):
+        raw_data = await ingestor.extract_metadata(url)
+    else:
+        # Sync ingestors block on network I/O and rate limiting, so keep them off the event loop
+        raw_data = await asyncio.to_thread(ingestor.extract_metadata, url)
+    normalized = ingestor.normalize_metadata(raw_data)
+    
+    row = {
+        "platform": ingestor.platform,
+        "url": url,
+        "title": title or normalized.get("title"),
+        "author": normalized.get("author"),
+        "thumbnail_url": normalized.get("thumbnail_url"),
+        "description": normalized.get("description"),
+        "note": note,
+        "published_at": normalized.get("published_at"),
+        "user_id": user_id,
+        "raw": json.dumps(raw_data, default=str)
+    }
+    details = _youtube_details_row(normalized["platform_specific"]) if ingestor.platform == "youtube" else None
+    
+    # The writer owns its session and already maps unique violations to ValueError
+    loop = asyncio.get_running_loop()
+    future = await loop.run_in_executor(None, _WRITER.submit, row, details)
+    result = await asyncio.wrap_future(future)
+    
+    logger.info(f"Created new {ingestor.platform} bookmark: {result['title']}")
+    return result
 
 async def _update_existing_bookmark(bookmark: Bookmark, ingestor: BaseIngestor, url: str, db: Session) -> Dict[str, Any]:
     try:
@@ -184,25 +190,23 @@ async def _update_existing_bookmark(bookmark: Bookmark, ingestor: BaseIngestor,
         db.rollback()
         raise RuntimeError(f"Failed to update bookmark: {str(e)}")
 
-def _create_youtube_details(bookmark_id: int, platform_data: Dict[str, Any], db: Session):
-    details = YouTubeDetails(
-        bookmark_id=bookmark_id,
-        video_id=platform_data["video_id"],
-        channel_id=platform_data.get("channel_id"),
-        duration_seconds=platform_data.get("duration_seconds"),
-        view_count=platform_data.get("view_count"),
-        like_count=platform_data.get("like_count"),
-        tags=json.dumps(platform_data.get("tags", [])),
-        extra=json.dumps(platform_data.get("extra", {}))
-    )
-    db.add(details)
+def _youtube_details_row(platform_data: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "video_id": platform_data["video_id"],
+        "channel_id": platform_data.get("channel_id"),
+        "duration_seconds": platform_data.get("duration_seconds"),
+        "view_count": platform_data.get("view_count"),
+        "like_count": platform_data.get("like_count"),
+        "tags": platform_data.get("tags", []),
+        "extra": json.dumps(platform_data.get("extra", {}))
+    }
 
 def _update_youtube_details(details: YouTubeDetails, platform_data: Dict[str, Any]):
     details.channel_id = platform_data.get("channel_id") or details.channel_id
     details.duration_seconds = platform_data.get("duration_seconds") or details.duration_seconds
     details.view_count = platform_data.get("view_count") or details.view_count
     details.like_count = platform_data.get("like_count") or details.like_count
-    details.tags = json.dumps(platform_data.get("tags", [])) if platform_data.get("tags") else details.tags
+    details.tags = platform_data.get("tags") or details.tags
     details.extra = json.dumps(platform_data.get("extra", {})) if platform_data.get("extra") else details.extra
 
 def _format_bookmark_response(bookmark: Bookmark) -> Dict[str, Any]:
@@ -227,30 +231,17 @@ def _format_bookmark_response(bookmark: Bookmark) -> Dict[str, Any]:
             "duration_seconds": yt.duration_seconds,
             "view_count": yt.view_count,
             "like_count": yt.like_count,
-            "tags": json.loads(yt.tags) if yt.tags else []
+            "tags": yt.tags or []
         }
     
     return response
 
-def _detect_platform(url: str) -> str:
-    url_lower = url.lower()
-    if "youtube.com" in url_lower or "youtu.be" in url_lower:
-        return "youtube"
-    elif "tiktok.com" in url_lower:
-        return "tiktok"
-    elif "instagram.com" in url_lower:
-        return "instagram"
-    elif "twitter.com" in url_lower or "x.com" in url_lower:
-        return "twitter"
-    elif "linkedin.com" in url_lower:
-        return "linkedin"
-    elif "reddit.com" in url_lower:
-        return "reddit"
-    elif "pinterest.com" in url_lower or "pin.it" in url_lower:
-        return "pinterest"
-    elif "snapchat.com" in url_lower:
-        return "snapchat"
-    elif "facebook.com" in url_lower or "fb.com" in url_lower:
-        return "facebook"
-    else:
-        return "other" 
+_WRITER = BookmarkWriter(_format_bookmark_response)
+
+def close_writer():
+    _WRITER.close(timeout=10)
+
+async def close_browsers():
+    for ingestor in INGESTORS:
+        if isinstance(ingestor, TikTokIngestor):
+            await ingestor.close_browser()
@@ -1,13 +1,15 @@
 import logging
 import asyncio
-import json
+from time import perf_counter
+import orjson
+from datetime import date, datetime
 from typing import Dict, Any, Optional
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
-from concurrent.futures import ThreadPoolExecutor
 from .base import BaseIngestor
 from .youtube_optimized import YouTubeOptimizedIngestor
 from .tiktok_optimized import TikTokOptimizedIngestor
+from .platforms import detect_platform, platform_for_host
 from .social import (
     InstagramIngestor, 
     TwitterIngestor,
@@ -34,7 +36,18 @@ OPTIMIZED_INGESTORS = [
     FacebookIngestor(),
 ]
 
-PROCESSING_POOL = ThreadPoolExecutor(max_workers=10, thread_name_prefix="video_processor")
+_NATIVE_TYPES = frozenset({str, int, float, bool, type(None), datetime, date})
+
+def _sanitize(obj: Any) -> Any:
+    if type(obj) in _NATIVE_TYPES:
+        return obj
+    if isinstance(obj, dict):
+        return {k if type(k) is str else str(k): _sanitize(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_sanitize(v) for v in obj]
+    return str(obj)
+
+_EXTRACT_SEM = asyncio.Semaphore(20)
 
 def get_ingestor(url: str) -> Optional[BaseIngestor]:
     for ingestor in OPTIMIZED_INGESTORS:
@@ -42,32 +55,44 @@ def get_ingestor(url: str) -> Optional[BaseIngestor]:
             return ingestor
     return None
 
-async def add_bookmark_ultra_fast(url: str, user_id: int, db: Session = None) -> Dict[str, Any]:
+async def add_bookmark_ultra_fast(url: str, user_id: int, db: Session = None, *, title: Optional[str] = None, note: Optional[str] = None, host: Optional[str] = None) -> Dict[str, Any]:
     should_close_db = False
     if db is None:
         db = SessionLocal()
         should_close_db = True
     
     try:
-        start_time = asyncio.get_event_loop().time()
+        start_time = perf_counter()
         
         ingestor = get_ingestor(url)
         
         if not ingestor:
             logger.info(f"No optimized ingestor found for URL: {url}, creating basic bookmark")
-            return _create_basic_bookmark(url, user_id, db)
+            platform = platform_for_host(host) if host is not None else detect_platform(url)
+            return await asyncio.to_thread(_create_basic_bookmark, url, user_id, db, title, note, platform)
         
         logger.info(f"🚀 Using OPTIMIZED {ingestor.platform} ingestor for URL: {url}")
         
-        existing = db.query(Bookmark).filter(Bookmark.url == url, Bookmark.user_id == user_id).first()
+        # Extract speculatively while the existence check runs; a wasted extract stays cached
+        exists, raw_data = await asyncio.gather(
+            asyncio.to_thread(_bookmark_exists, url, user_id),
+            _extract_bounded(ingestor, url),
+            return_exceptions=True
+        )
         
-        if existing:
+        if isinstance(exists, BaseException):
+            raise exists
+        
+        if exists:
             logger.info(f"Bookmark already exists for URL: {url}")
             raise ValueError("You already have this link bookmarked! Check your existing bookmarks to find it.")
         
-        result = await _create_new_bookmark_optimized(ingestor, url, user_id, db)
+        if isinstance(raw_data, BaseException):
+            raise raw_data
+        
+        result = await _create_new_bookmark_optimized(ingestor, url, user_id, raw_data, db, title=title, note=note)
         
-        elapsed = asyncio.get_event_loop().time() - start_time
+        elapsed = perf_counter() - start_time
         logger.info(f"⚡ TOTAL bookmark processing completed in {elapsed:.2f}s")
         
         return result
@@ -80,35 +105,46 @@ async def add_bookmark_ultra_fast(url: str, user_id: int, db: Session = None) ->
         raise RuntimeError(f"Failed to add bookmark: {str(e)}")
     finally:
         if should_close_db:
-            db.close()
+            await asyncio.to_thread(db.close)
+
+async def _extract_bounded(ingestor: BaseIngestor, url: str) -> Dict[str, Any]:
+    async with _EXTRACT_SEM:
+        return await ingestor.extract_metadata(url)
+
+def _bookmark_exists(url: str, user_id: int) -> bool:
+    with SessionLocal() as session:
+        return session.query(Bookmark.id).filter(Bookmark.url == url, Bookmark.user_id == user_id).first() is not None
+
+async def _create_new_bookmark_optimized(ingestor: BaseIngestor, url: str, user_id: int, raw_data: Dict[str, Any], db: Session, *, title: Optional[str] = None, note: Optional[str] = None) -> Dict[str, Any]:
+    normalized = ingestor.normalize_metadata(raw_data)
+    
+    return await asyncio.to_thread(_save_bookmark_optimized, ingestor.platform, url, user_id, raw_data, normalized, db, title, note)
 
-async def _create_new_bookmark_optimized(ingestor: BaseIngestor, url: str, user_id: int, db: Session) -> Dict[str, Any]:
+def _save_bookmark_optimized(platform: str, url: str, user_id: int, raw_data: Dict[str, Any], normalized: Dict[str, Any], db: Session, title: Optional[str] = None, note: Optional[str] = None) -> Dict[str, Any]:
     try:
-        raw_data = await ingestor.extract_metadata(url)
-        normalized = ingestor.normalize_metadata(raw_data)
-        
         bookmark = Bookmark(
-            platform=ingestor.platform,
+            platform=platform,
             url=url,
-            title=normalized.get("title"),
+            title=title or normalized.get("title"),
             author=normalized.get("author"),
             thumbnail_url=normalized.get("thumbnail_url"),
             description=normalized.get("description"),
+            note=note,
             published_at=normalized.get("published_at"),
             user_id=user_id,
-            raw=json.dumps(raw_data, default=str) 
+            raw=orjson.dumps(_sanitize(raw_data), option=orjson.OPT_PASSTHROUGH_SUBCLASS).decode()
         )
         
         db.add(bookmark)
         db.flush()
         
-        if ingestor.platform == "youtube":
+        if platform == "youtube":
             _create_youtube_details_optimized(bookmark.id, normalized["platform_specific"], db)
         
         db.commit()
         db.refresh(bookmark)
         
-        logger.info(f"✅ Created OPTIMIZED {ingestor.platform} bookmark: {bookmark.title}")
+        logger.info(f"✅ Created OPTIMIZED {platform} bookmark: {bookmark.title}")
         return _format_bookmark_response_optimized(bookmark)
         
     except IntegrityError as e:
@@ -125,13 +161,26 @@ def _create_youtube_details_optimized(bookmark_id: int, platform_data: Dict[str,
         duration_seconds=platform_data.get("duration_seconds"),
         view_count=platform_data.get("view_count"),
         like_count=platform_data.get("like_count"),
-        tags=json.dumps(platform_data.get("tags", [])),
-        extra=json.dumps({}) 
+        tags=platform_data.get("tags", [])
     )
     db.add(details)
 
+def _youtube_meta(bookmark: Bookmark) -> Dict[str, Any]:
+    if bookmark.platform != "youtube" or not bookmark.youtube_details:
+        return {}
+    yt = bookmark.youtube_details[0]
+    return {
+        "video_id": yt.video_id,
+        "channel_id": yt.channel_id,
+        "duration_seconds": yt.duration_seconds,
+        "view_count": yt.view_count,
+        "like_count": yt.like_count,
+        "tags": yt.tags or []
+    }
+
 def _format_bookmark_response_optimized(bookmark: Bookmark) -> Dict[str, Any]:
-    response = {
+    published_at = bookmark.published_at
+    return {
         "id": bookmark.id,
         "platform": bookmark.platform,
         "url": bookmark.url,
@@ -139,33 +188,21 @@ def _format_bookmark_response_optimized(bookmark: Bookmark) -> Dict[str, Any]:
         "author": bookmark.author,
         "thumbnail_url": bookmark.thumbnail_url,
         "note": bookmark.note,
-        "published_at": bookmark.published_at.isoformat() if bookmark.published_at else None,
+        "published_at": published_at.isoformat() if published_at else None,
         "created_at": bookmark.created_at.isoformat(),
-        "meta": {}
+        "meta": _youtube_meta(bookmark)
     }
-    
-    if bookmark.platform == "youtube" and bookmark.youtube_details:
-        yt = bookmark.youtube_details[0]
-        response["meta"] = {
-            "video_id": yt.video_id,
-            "channel_id": yt.channel_id,
-            "duration_seconds": yt.duration_seconds,
-            "view_count": yt.view_count,
-            "like_count": yt.like_count,
-            "tags": json.loads(yt.tags) if yt.tags else []
-        }
-    
-    return response
 
-def _create_basic_bookmark(url: str, user_id: int, db: Session) -> Dict[str, Any]:
+def _create_basic_bookmark(url: str, user_id: int, db: Session, title: Optional[str] = None, note: Optional[str] = None, platform: Optional[str] = None) -> Dict[str, Any]:
     try:
-        platform = _detect_platform(url)
+        platform = platform or detect_platform(url)
         
         bookmark = Bookmark(
             platform=platform,
             url=url,
-            user_id=user_id,
-            raw='{}'
+            title=title,
+            note=note,
+            user_id=user_id
         )
         
         db.add(bookmark)
@@ -180,29 +217,6 @@ def _create_basic_bookmark(url: str, user_id: int, db: Session) -> Dict[str, Any
             raise ValueError("You already have this link bookmarked! Check your existing bookmarks to find it.")
         raise RuntimeError(f"Database error: {str(e)}")
 
-def _detect_platform(url: str) -> str:
-    url_lower = url.lower()
-    if "youtube.com" in url_lower or "youtu.be" in url_lower:
-        return "youtube"
-    elif "tiktok.com" in url_lower:
-        return "tiktok"
-    elif "instagram.com" in url_lower:
-        return "instagram"
-    elif "twitter.com" in url_lower or "x.com" in url_lower:
-        return "twitter"
-    elif "linkedin.com" in url_lower:
-        return "linkedin"
-    elif "reddit.com" in url_lower:
-        return "reddit"
-    elif "pinterest.com" in url_lower or "pin.it" in url_lower:
-        return "pinterest"
-    elif "snapchat.com" in url_lower:
-        return "snapchat"
-    elif "facebook.com" in url_lower or "fb.com" in url_lower:
-        return "facebook"
-    else:
-        return "other"
-
 async def process_bookmark_background(url: str, user_id: int) -> Dict[str, Any]:
     try:
         return await add_bookmark_ultra_fast(url, user_id)
@@ -1,4 +1,5 @@
 from .base import BaseIngestor
+from .platforms import platform_for_host, url_host
 from typing import Dict, Any, Optional
 import re
 from urllib.parse import urlparse
@@ -18,8 +19,8 @@ class SocialMediaIngestor(BaseIngestor):
         return self._platform
     
     def can_handle(self, url: str) -> bool:
-        url_lower = url.lower()
-        return any(pattern in url_lower for pattern in self.domain_patterns)
+        # Host table lookup instead of substring scans, so e.g. "box.com" no longer matches "x.com"
+        return platform_for_host(url_host(url)) == self._platform
     
     def extract_metadata(self, url: str) -> Dict[str, Any]:
         try:
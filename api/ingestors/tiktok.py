@@ -1,45 +1,147 @@
+import copy
+import os
 import re
-import json
+import tempfile
+import time
+import orjson
 import logging
 import asyncio
-from typing import Dict, Any, Optional, List
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime
 from urllib.parse import urlparse
-import httpx
-from playwright.async_api import async_playwright
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+from http_client import CLIENT
 from .base import BaseIngestor
 
 logger = logging.getLogger(__name__)
 
+_VIDEO_ID_RE = re.compile(r'tiktok\.com/@[^/]+/video/(\d+)')
+_SHORT_RE = re.compile(r'vm\.tiktok\.com/([A-Za-z0-9]+)')
+_USERNAME_RE = re.compile(r'tiktok\.com/@([^/]+)')
+_HASHTAG_RE = re.compile(r'#(\w+)')
+_SCRIPT_RE = re.compile(rb'<script[^>]*id="__UNIVERSAL_DATA_FOR_REHYDRATION__"[^>]*>(.*?)</script>', re.S)
+_MIN_PAGE_BYTES = 5000
+_SCRIPT_SELECTOR = 'script#__UNIVERSAL_DATA_FOR_REHYDRATION__'
+_BLOCKED_RESOURCE_TYPES = frozenset({"image", "stylesheet", "font", "media"})
+_BLOCKED_PATH_RE = re.compile(r"/(analytics|ads)/")
+
+_DEBUG_DUMP = bool(os.getenv("TIKTOK_DEBUG_DUMP"))
+_DEBUG_DUMP_MAX_BYTES = 2_000_000
+_CACHE_TTL = 6 * 60 * 60
+_CACHE_MAX = 1024
+
+MAX_PARALLEL_PAGES = int(os.getenv("TIKTOK_CONCURRENCY", "4"))
+
+# Playwright already passes the background/first-run/extension flags, so only the container ones are needed
+_CHROMIUM_ARGS = (
+    '--no-sandbox',
+    '--disable-setuid-sandbox',
+    '--disable-dev-shm-usage',
+    '--disable-gpu',
+)
+_CONTEXT_POOL_SIZE = int(os.getenv("TIKTOK_CTX_POOL", "3"))
+
+def _split_hashtags(desc: str) -> tuple[List[str], str]:
+    # One pass collects the tags and stitches the caption back together without them
+    hashtags = []
+    parts = []
+    last = 0
+    for m in _HASHTAG_RE.finditer(desc):
+        hashtags.append(m.group(1))
+        parts.append(desc[last:m.start()])
+        last = m.end()
+    parts.append(desc[last:])
+    return hashtags, ''.join(parts).strip()
+
+def _write_debug_dump(data: Dict[str, Any]) -> str:
+    # Timestamped so concurrent failures don't overwrite each other
+    path = os.path.join(tempfile.gettempdir(), f"tiktok_debug_{time.time_ns()}.json")
+    with open(path, "wb") as f:
+        f.write(orjson.dumps(data, default=str, option=orjson.OPT_INDENT_2)[:_DEBUG_DUMP_MAX_BYTES])
+    return path
+
+def _find_video_data(scope_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    video_detail = scope_data.get("webapp.video-detail")
+    if isinstance(video_detail, dict):
+        item_info = video_detail.get("itemInfo")
+        if isinstance(item_info, dict) and "itemStruct" in item_info:
+            logger.info("Found video data via webapp.video-detail path")
+            return item_info["itemStruct"]
+    else:
+        ab_data = scope_data.get("webapp.a-b")
+        if isinstance(ab_data, dict):
+            for key, value in ab_data.items():
+                if isinstance(value, dict) and "itemStruct" in value:
+                    logger.info(f"Found video data via webapp.a-b.{key} path")
+                    return value["itemStruct"]
+    
+    # Only reached when the known paths missed
+    for key, value in scope_data.items():
+        if not isinstance(value, dict):
+            continue
+        item_info = value.get("itemInfo")
+        if item_info is not None:
+            if isinstance(item_info, dict) and "itemStruct" in item_info:
+                logger.info(f"Found video data via {key}.itemInfo.itemStruct path")
+                return item_info["itemStruct"]
+        elif "itemStruct" in value:
+            logger.info(f"Found video data via {key}.itemStruct path")
+            return value["itemStruct"]
+    return None
+
+async def _route_filter(route):
+    # resource_type is already known to Playwright, so one handler replaces the per-extension globs
+    request = route.request
+    if request.resource_type in _BLOCKED_RESOURCE_TYPES or _BLOCKED_PATH_RE.search(request.url):
+        await route.abort()
+    else:
+        await route.continue_()
+
 class TikTokIngestor(BaseIngestor):
     
     def __init__(self):
         self.client = None
         self._initialized = False
+        self._pw = None
+        self._browser = None
+        self._browser_lock = asyncio.Lock()
+        # Slots hold a warm context, or None until one is first needed
+        self._contexts: asyncio.Queue = asyncio.Queue()
+        for _ in range(_CONTEXT_POOL_SIZE):
+            self._contexts.put_nowait(None)
+        self._cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
     
     async def _ensure_initialized(self):
         if not self._initialized:
-            try:
-                limits = httpx.Limits(max_keepalive_connections=20, max_connections=100)
-                self.client = httpx.AsyncClient(
-                    timeout=httpx.Timeout(10.0, connect=5.0),
-                    limits=limits,
-                    http2=False,
-                    headers={
-                        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-                        "Accept-Language": "en-US,en;q=0.5",
-                        "Accept-Encoding": "gzip, deflate, br",
-                        "DNT": "1",
-                        "Connection": "keep-alive",
-                        "Upgrade-Insecure-Requests": "1",
-                    }
-                )
-                self._initialized = True
-                logger.info("TikTok HTTP client initialized successfully with connection pooling")
-            except Exception as e:
-                logger.error(f"Failed to initialize TikTok client: {e}")
-                raise ValueError(f"TikTok client initialization failed: {str(e)}")
+            self.client = CLIENT
+            self._initialized = True
+    
+    async def _get_browser(self):
+        if self._browser is not None and self._browser.is_connected():
+            return self._browser
+        
+        async with self._browser_lock:
+            if self._browser is None or not self._browser.is_connected():
+                if self._pw is None:
+                    self._pw = await async_playwright().start()
+                # Chromium is launched once and reused; each extraction only opens a fresh context
+                self._browser = await self._pw.chromium.launch(headless=True, args=_CHROMIUM_ARGS)
+                logger.info("TikTok browser launched")
+        return self._browser
+    
+    async def close_browser(self):
+        async with self._browser_lock:
+            if self._browser is not None:
+                try:
+                    await self._browser.close()
+                except Exception as e:
+                    logger.warning(f"Error closing TikTok browser: {e}")
+                self._browser = None
+            if self._pw is not None:
+                await self._pw.stop()
+                self._pw = None
     
     @property
     def platform(self) -> str:
@@ -61,13 +163,11 @@ class TikTokIngestor(BaseIngestor):
     
     def extract_video_id(self, url: str) -> Optional[str]:
         try:
-            video_pattern = r'tiktok\.com/@[^/]+/video/(\d+)'
-            match = re.search(video_pattern, url)
+            match = _VIDEO_ID_RE.search(url)
             if match:
                 return match.group(1)
             
-            short_pattern = r'vm\.tiktok\.com/([A-Za-z0-9]+)'
-            match = re.search(short_pattern, url)
+            match = _SHORT_RE.search(url)
             if match:
                 return match.group(1)
             
@@ -77,8 +177,7 @@ class TikTokIngestor(BaseIngestor):
     
     def extract_username(self, url: str) -> Optional[str]:
         try:
-            username_pattern = r'tiktok\.com/@([^/]+)'
-            match = re.search(username_pattern, url)
+            match = _USERNAME_RE.search(url)
             if match:
                 return match.group(1)
             return None
@@ -88,126 +187,186 @@ class TikTokIngestor(BaseIngestor):
     async def extract_metadata(self, url: str) -> Dict[str, Any]:
         await self._ensure_initialized()
         
+        video_id = self.extract_video_id(url)
+        if video_id:
+            cached = self._get_cached(video_id)
+            if cached is not None:
+                logger.info(f"TikTok cache hit for video {video_id}")
+                return cached
+        
+        # Concurrent saves of the same video share one scrape instead of each opening a page
+        key = video_id or url
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._extract_and_cache(url, video_id))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            logger.info(f"Joining in-flight TikTok extraction for {key}")
+        
+        # shield keeps one caller's cancellation from killing the scrape the others wait on
+        result = await asyncio.shield(task)
+        return copy.deepcopy(result)
+    
+    async def _extract_and_cache(self, url: str, video_id: Optional[str]) -> Dict[str, Any]:
+        result = await self._extract_live(url)
+        if video_id:
+            self._cache_result(video_id, result)
+        return result
+    
+    def _get_cached(self, video_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._cache.get(video_id)
+        if entry is None:
+            return None
+        
+        stored_at, result = entry
+        # Engagement stats drift, so entries expire instead of living until evicted
+        if time.monotonic() - stored_at > _CACHE_TTL:
+            del self._cache[video_id]
+            return None
+        
+        self._cache.move_to_end(video_id)
+        return copy.deepcopy(result)
+    
+    def _cache_result(self, video_id: str, result: Dict[str, Any]):
+        self._cache[video_id] = (time.monotonic(), result)
+        self._cache.move_to_end(video_id)
+        if len(self._cache) > _CACHE_MAX:
+            self._cache.popitem(last=False)
+    
+    async def _extract_live(self, url: str) -> Dict[str, Any]:
         try:
             logger.info(f"Extracting TikTok metadata from: {url}")
             
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(
-                    headless=True,
-                    args=[
-                        '--no-sandbox',
-                        '--disable-setuid-sandbox',
-                        '--disable-dev-shm-usage',
-                        '--disable-accelerated-2d-canvas',
-                        '--disable-gpu',
-                        '--disable-background-timer-throttling',
-                        '--disable-backgrounding-occluded-windows',
-                        '--disable-renderer-backgrounding',
-                        '--disable-features=TranslateUI',
-                        '--disable-ipc-flooding-protection',
-                        '--disable-web-security',
-                        '--disable-extensions',
-                        '--disable-default-apps',
-                        '--no-first-run',
-                        '--no-default-browser-check',
-                        '--disable-sync',
-                        '--disable-background-networking'
-                    ]
-                )
-                context = await browser.new_context(
-                    user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                    java_script_enabled=True,
-                    ignore_https_errors=True
-                )
-                page = await context.new_page()
-                
-                await page.route("**/*.{png,jpg,jpeg,gif,svg,css,woff,woff2,ttf}", lambda route: route.abort())
-                await page.route("**/analytics/**", lambda route: route.abort())
-                await page.route("**/ads/**", lambda route: route.abort())
-                
-                await page.goto(url, wait_until='domcontentloaded', timeout=15000)
-                
-                await page.wait_for_timeout(800)
-                
-                script_content = await page.evaluate("""
-                    () => {
-                        const script = document.querySelector('script[id="__UNIVERSAL_DATA_FOR_REHYDRATION__"]');
-                        return script ? script.textContent : null;
-                    }
-                """)
-                
-                await browser.close()
+            data = await self._fetch_data_http(url)
+            if data is None:
+                logger.info(f"Falling back to browser extraction for: {url}")
+                script_content = await self._fetch_script_browser(url)
                 
                 if not script_content:
                     raise ValueError("Could not find TikTok data script")
                 
-                data = json.loads(script_content)
-                
-                video_data = None
-                
-                logger.info(f"Available top-level keys: {list(data.keys())}")
-                
-                try:
-                    if "__DEFAULT_SCOPE__" in data:
-                        scope_data = data["__DEFAULT_SCOPE__"]
-                        logger.info(f"Available scope keys: {list(scope_data.keys())}")
-                        
-                        if "webapp.video-detail" in scope_data:
-                            video_detail = scope_data["webapp.video-detail"]
-                            if "itemInfo" in video_detail:
-                                video_data = video_detail["itemInfo"]["itemStruct"]
-                                logger.info("Found video data via webapp.video-detail path")
-                        
-                        elif "webapp.a-b" in scope_data:
-                            ab_data = scope_data["webapp.a-b"]
-                            for key, value in ab_data.items():
-                                if isinstance(value, dict) and "itemStruct" in value:
-                                    video_data = value["itemStruct"]
-                                    logger.info(f"Found video data via webapp.a-b.{key} path")
-                                    break
+                data = orjson.loads(script_content)
+            
+            video_data = None
+            
+            logger.info(f"Available top-level keys: {list(data.keys())}")
+            
+            scope_data = data.get("__DEFAULT_SCOPE__")
+            if isinstance(scope_data, dict):
+                logger.info(f"Available scope keys: {list(scope_data.keys())}")
+                video_data = _find_video_data(scope_data)
+            
+            if not video_data:
+                if isinstance(scope_data, dict):
+                    video_detail = scope_data.get("webapp.video-detail")
+                    if isinstance(video_detail, dict):
+                        status_code = video_detail.get("statusCode")
+                        status_msg = video_detail.get("statusMsg", "")
                         
-                        for key in scope_data.keys():
-                            if not video_data and isinstance(scope_data[key], dict):
-                                if "itemInfo" in scope_data[key]:
-                                    if "itemStruct" in scope_data[key]["itemInfo"]:
-                                        video_data = scope_data[key]["itemInfo"]["itemStruct"]
-                                        logger.info(f"Found video data via {key}.itemInfo.itemStruct path")
-                                        break
-                                elif "itemStruct" in scope_data[key]:
-                                    video_data = scope_data[key]["itemStruct"]
-                                    logger.info(f"Found video data via {key}.itemStruct path")
-                                    break
-                
-                except KeyError as e:
-                    logger.warning(f"KeyError while extracting video data: {e}")
-                
-                if not video_data:
-                    if "__DEFAULT_SCOPE__" in data and "webapp.video-detail" in data["__DEFAULT_SCOPE__"]:
-                        video_detail = data["__DEFAULT_SCOPE__"]["webapp.video-detail"]
-                        if isinstance(video_detail, dict):
-                            status_code = video_detail.get("statusCode")
-                            status_msg = video_detail.get("statusMsg", "")
-                            
-                            if status_code == 10204 or "doesn't exist" in status_msg.lower():
-                                raise ValueError("This TikTok video has been deleted, made private, or doesn't exist")
-                            elif status_code and status_msg:
-                                raise ValueError(f"TikTok error: {status_msg} (code: {status_code})")
-                    
-                    with open("tiktok_debug_data.json", "w") as f:
-                        json.dump(data, f, indent=2, default=str)
-                    logger.error("Could not extract video data. Raw data saved to tiktok_debug_data.json")
-                    raise ValueError("Could not extract video data from TikTok page - the video might be private, deleted, or region-blocked")
-                
-                logger.info(f"Successfully extracted TikTok metadata for: {video_data.get('desc', 'Unknown')[:50]}...")
-                return {
-                    'video_data': video_data,
-                    'comments': []
-                }
+                        if status_code == 10204 or "doesn't exist" in status_msg.lower():
+                            raise ValueError("This TikTok video has been deleted, made private, or doesn't exist")
+                        elif status_code and status_msg:
+                            raise ValueError(f"TikTok error: {status_msg} (code: {status_code})")
                 
+                if _DEBUG_DUMP:
+                    path = await asyncio.to_thread(_write_debug_dump, data)
+                    logger.error(f"Could not extract video data. Raw data saved to {path}")
+                else:
+                    logger.error("Could not extract video data. Set TIKTOK_DEBUG_DUMP=1 to save the raw page data")
+                raise ValueError("Could not extract video data from TikTok page - the video might be private, deleted, or region-blocked")
+            
+            logger.info(f"Successfully extracted TikTok metadata for: {video_data.get('desc', 'Unknown')[:50]}...")
+            return {
+                'video_data': video_data,
+                'comments': []
+            }
+            
         except Exception as e:
             logger.error(f"Error extracting TikTok metadata for {url}: {e}")
             raise ValueError(f"TikTok metadata extraction failed: {str(e)}")
     
+    async def _fetch_data_http(self, url: str) -> Optional[Dict[str, Any]]:
+        # The rehydration script is server-rendered, so a plain GET usually has everything we need
+        try:
+            response = await self.client.get(url)
+            if response.status_code != 200 or len(response.content) < _MIN_PAGE_BYTES:
+                return None
+            
+            match = _SCRIPT_RE.search(response.content)
+            if not match:
+                return None
+            
+            data = orjson.loads(match.group(1))
+            # Bot-check pages still ship the script but without the video detail scope
+            if "webapp.video-detail" not in data.get("__DEFAULT_SCOPE__", {}):
+                return None
+            return data
+        except Exception as e:
+            logger.warning(f"TikTok HTTP fetch failed for {url}: {e}")
+            return None
+    
+    async def _new_context(self, browser):
+        context = await browser.new_context(
+            user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+            ignore_https_errors=True
+        )
+        await context.route("**/*", _route_filter)
+        return context
+    
+    async def _acquire_context(self):
+        context = await self._contexts.get()
+        try:
+            browser = await self._get_browser()
+            if context is None or context.browser is not browser:
+                # Empty slot, or a context left over from a browser that has since been relaunched
+                context = await self._new_context(browser)
+        except Exception:
+            self._contexts.put_nowait(None)
+            raise
+        return context
+    
+    async def _fetch_script_browser(self, url: str) -> Optional[str]:
+        context = await self._acquire_context()
+        try:
+            page = await context.new_page()
+            try:
+                await page.goto(url, wait_until='domcontentloaded', timeout=15000)
+                
+                try:
+                    await page.wait_for_selector(_SCRIPT_SELECTOR, state='attached', timeout=5000)
+                except PlaywrightTimeoutError:
+                    logger.warning(f"TikTok data script did not appear in time for: {url}")
+                    await page.wait_for_timeout(800)
+                
+                script = page.locator(_SCRIPT_SELECTOR).first
+                # text_content would otherwise block on the default timeout when the tag never showed up
+                if not await script.count():
+                    return None
+                return await script.text_content()
+            finally:
+                await page.close()
+        except Exception:
+            # Don't hand a context that just failed to the next caller
+            try:
+                await context.close()
+            except Exception:
+                pass
+            context = None
+            raise
+        finally:
+            self._contexts.put_nowait(context)
+    
+    async def extract_metadata_many(self, urls: List[str]) -> List[Any]:
+        sem = asyncio.Semaphore(MAX_PARALLEL_PAGES)
+        
+        async def _one(url: str):
+            async with sem:
+                return await self.extract_metadata(url)
+        
+        # Failures come back in place as exceptions so one bad link does not sink the batch
+        return await asyncio.gather(*(_one(url) for url in urls), return_exceptions=True)
+    
     def normalize_metadata(self, raw_data: Dict[str, Any]) -> Dict[str, Any]:
         try:
             video_data = raw_data.get('video_data', {})
@@ -217,10 +376,18 @@ class TikTokIngestor(BaseIngestor):
             author_info = video_data.get('author', {})
             stats = video_data.get('stats', {})
             
-            desc = video_data.get('desc', '') or ''
-            hashtags = re.findall(r'#(\w+)', desc)
+            play_count = stats.get('playCount')
+            digg_count = stats.get('diggCount')
+            comment_count = stats.get('commentCount')
+            share_count = stats.get('shareCount')
+            views = play_count or 0
+            likes = digg_count or 0
+            comments = comment_count or 0
+            shares = share_count or 0
+            engagement_rate = round(((likes + comments + shares) / views) * 100, 2) if views else 0.0
             
-            clean_desc = re.sub(r'#\w+', '', desc).strip()
+            desc = video_data.get('desc', '') or ''
+            hashtags, clean_desc = _split_hashtags(desc)
             
             title = None
             if clean_desc:
@@ -245,13 +412,14 @@ class TikTokIngestor(BaseIngestor):
                         'created_at': comment.get('createTime')
                     })
             
-            published_at = None
+            # TikTok sends createTime as an int; digit strings are the only other shape worth parsing
             create_time = video_data.get('createTime')
-            if create_time:
-                try:
-                    published_at = datetime.fromtimestamp(int(create_time))
-                except:
-                    published_at = None
+            if isinstance(create_time, (int, float)) and create_time:
+                published_at = datetime.fromtimestamp(create_time)
+            elif isinstance(create_time, str) and create_time.isdigit():
+                published_at = datetime.fromtimestamp(int(create_time))
+            else:
+                published_at = None
             
             normalized = {
                 "title": title,
@@ -266,10 +434,10 @@ class TikTokIngestor(BaseIngestor):
                     "author_follower_count": author_info.get('followerCount'),
                     "author_verified": author_info.get('verified', False),
                     "duration_seconds": video_info.get('duration'),
-                    "view_count": stats.get('playCount'),
-                    "like_count": stats.get('diggCount'),
-                    "comment_count": stats.get('commentCount'),
-                    "share_count": stats.get('shareCount'),
+                    "view_count": play_count,
+                    "like_count": digg_count,
+                    "comment_count": comment_count,
+                    "share_count": share_count,
                     "hashtags": hashtags,
                     "video_url": video_url,
                     "video_width": video_info.get('width'),
@@ -280,11 +448,11 @@ class TikTokIngestor(BaseIngestor):
                         "hashtags_for_tagging": hashtags,
                         "comments_sample": processed_comments,
                         "engagement_metrics": {
-                            "views": stats.get('playCount', 0),
-                            "likes": stats.get('diggCount', 0),
-                            "comments": stats.get('commentCount', 0),
-                            "shares": stats.get('shareCount', 0),
-                            "engagement_rate": self._calculate_engagement_rate(stats)
+                            "views": views,
+                            "likes": likes,
+                            "comments": comments,
+                            "shares": shares,
+                            "engagement_rate": engagement_rate
                         },
                         "author_metadata": {
                             "username": author_info.get('uniqueId'),
@@ -307,28 +475,10 @@ class TikTokIngestor(BaseIngestor):
             logger.error(f"Error normalizing TikTok metadata: {e}")
             raise ValueError(f"Failed to normalize metadata: {str(e)}")
     
-    def _calculate_engagement_rate(self, stats: Dict[str, Any]) -> float:
-        try:
-            views = stats.get('playCount', 0)
-            likes = stats.get('diggCount', 0)
-            comments = stats.get('commentCount', 0)
-            shares = stats.get('shareCount', 0)
-            
-            if views == 0:
-                return 0.0
-            
-            total_engagement = likes + comments + shares
-            return round((total_engagement / views) * 100, 2)
-        except:
-            return 0.0
-    
     async def __aenter__(self):
         await self._ensure_initialized()
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.client and self._initialized:
-            try:
-                await self.client.aclose()
-            except:
-                pass 
\ No newline at end of file
+        # The shared HTTP client is closed on application shutdown
+        await self.close_browser() 
\ No newline at end of file
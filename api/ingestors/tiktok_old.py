@@ -2,6 +2,7 @@ import asyncio
 import logging
 import re
 import json
+from functools import lru_cache
 from typing import Dict, Any, Optional, List
 from urllib.parse import urlparse
 from datetime import datetime
@@ -11,7 +12,35 @@ from .base import BaseIngestor
 
 logger = logging.getLogger(__name__)
 
+_HASHTAG_RE = re.compile(r'#\w+')
+_TAG_OR_MENTION_RE = re.compile(r'[#@]\w+')
+
+_VIDEO_ID_PATTERNS = (
+    re.compile(r'/video/(\d+)'),
+    re.compile(r'vm\.tiktok\.com/([A-Za-z0-9]+)'),
+    re.compile(r'/v/(\d+)'),
+    re.compile(r'tiktok\.com/@[^/]+/video/(\d+)'),
+)
+
+_POSSIBLE_THUMB_TEMPLATES = (
+    "https://p16-sign-va.tiktokcdn-us.com/obj/tos-useast2a-p-0068-tx/{}",
+    "https://p16-sign.tiktokcdn-us.com/obj/tos-useast2a-p-0068-tx/{}",
+    "https://p16-sign-va.tiktokcdn.com/obj/tos-useast2a-p-0068-tx/{}",
+)
+
+def _raw_dict(obj) -> Dict[str, Any]:
+    raw = getattr(obj, 'as_dict', None)
+    if callable(raw):
+        raw = raw()
+    return raw if isinstance(raw, dict) else {}
+
+@lru_cache(maxsize=4096)
+def _ts_to_iso(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp).isoformat()
+
 class TikTokIngestor(BaseIngestor):
+    __slots__ = ('api',)
+    
     def __init__(self):
         super().__init__()
         self.api = None
@@ -90,7 +119,10 @@ class TikTokIngestor(BaseIngestor):
                 
                 hashtags = self._extract_hashtags(video_data.desc or "")
                 
-                music_info = self._extract_music_info(video_data)
+                raw_video = _raw_dict(video_data)
+                _stats_get = (raw_video.get('stats') or {}).get
+                author_dict = raw_video.get('author') or {}
+                music_info = self._extract_music_info(raw_video)
                 
                 metadata = {
                     "platform": "tiktok",
@@ -104,15 +136,15 @@ class TikTokIngestor(BaseIngestor):
                         "id": video_data.id,
                         "hashtags": hashtags,
                         "stats": {
-                            "likes": getattr(video_data.stats, 'digg_count', 0),
-                            "comments": getattr(video_data.stats, 'comment_count', 0),
-                            "shares": getattr(video_data.stats, 'share_count', 0),
-                            "plays": getattr(video_data.stats, 'play_count', 0),
+                            "likes": _stats_get('diggCount', 0),
+                            "comments": _stats_get('commentCount', 0),
+                            "shares": _stats_get('shareCount', 0),
+                            "plays": _stats_get('playCount', 0),
                         },
                         "music": music_info,
                         "author": {
                             "username": video_data.author.username,
-                            "nickname": getattr(video_data.author, 'nickname', video_data.author.username),
+                            "nickname": author_dict.get('nickname', video_data.author.username),
                         }
                     }
                 }
@@ -131,7 +163,7 @@ class TikTokIngestor(BaseIngestor):
     def _get_title(self, video_data) -> str:
         if hasattr(video_data, 'desc') and video_data.desc:
             desc = video_data.desc.strip()
-            clean_desc = re.sub(r'#\w+|@\w+', '', desc).strip()
+            clean_desc = _TAG_OR_MENTION_RE.sub('', desc).strip()
             if clean_desc and len(clean_desc) > 10:
                 return clean_desc[:100] + "..." if len(clean_desc) > 100 else clean_desc
         
@@ -150,54 +182,28 @@ class TikTokIngestor(BaseIngestor):
                 return thumbnail_url
         
         if hasattr(video_data, 'id') and video_data.id:
-            video_id = video_data.id
-            possible_urls = [
-                f"https://p16-sign-va.tiktokcdn-us.com/obj/tos-useast2a-p-0068-tx/{video_id}",
-                f"https://p16-sign.tiktokcdn-us.com/obj/tos-useast2a-p-0068-tx/{video_id}",
-                f"https://p16-sign-va.tiktokcdn.com/obj/tos-useast2a-p-0068-tx/{video_id}",
-            ]
-            return possible_urls[0]
+            return _POSSIBLE_THUMB_TEMPLATES[0].format(video_data.id)
         
         return ""
 
     def _extract_hashtags(self, description: str) -> List[str]:
-        if not description:
+        if not description or '#' not in description:
             return []
         
-        hashtags = re.findall(r'#\w+', description)
-        return hashtags
+        return _HASHTAG_RE.findall(description)
 
-    def _extract_music_info(self, video_data) -> Dict[str, Any]:
-        music_info = {
-            "id": "",
-            "title": "",
-            "author": ""
+    def _extract_music_info(self, raw_video: Dict[str, Any]) -> Dict[str, Any]:
+        music = raw_video.get('music') or {}
+        return {
+            "id": music.get('id', ''),
+            "title": music.get('title', ''),
+            "author": music.get('authorName', ''),
         }
-        
-        try:
-            if hasattr(video_data, 'music') and video_data.music:
-                music = video_data.music
-                music_info.update({
-                    "id": getattr(music, 'id', ''),
-                    "title": getattr(music, 'title', ''),
-                    "author": getattr(music, 'author', ''),
-                })
-        except Exception as e:
-            logger.warning(f"Could not extract music info: {e}")
-        
-        return music_info
 
     def _extract_video_id(self, url: str) -> Optional[str]:
         try:
-            patterns = [
-                r'/video/(\d+)',
-                r'vm\.tiktok\.com/([A-Za-z0-9]+)',
-                r'/v/(\d+)',
-                r'tiktok\.com/@[^/]+/video/(\d+)',
-            ]
-            
-            for pattern in patterns:
-                match = re.search(pattern, url)
+            for pattern in _VIDEO_ID_PATTERNS:
+                match = pattern.search(url)
                 if match:
                     return match.group(1)
                     
@@ -208,10 +214,10 @@ class TikTokIngestor(BaseIngestor):
 
     def _parse_timestamp(self, timestamp: int) -> str:
         if timestamp:
+            if timestamp > 1e10: 
+                timestamp = timestamp / 1000
             try:
-                if timestamp > 1e10: 
-                    timestamp = timestamp / 1000
-                return datetime.fromtimestamp(timestamp).isoformat()
+                return _ts_to_iso(timestamp)
             except Exception as e:
                 logger.warning(f"Could not parse timestamp {timestamp}: {e}")
         return ""
@@ -224,7 +230,7 @@ class TikTokIngestor(BaseIngestor):
             video_id = self._extract_video_id(url)
             thumbnail_url = ''
             if video_id:
-                thumbnail_url = f'https://p16-sign-va.tiktokcdn-us.com/obj/tos-useast2a-p-0068-tx/{video_id}'
+                thumbnail_url = _POSSIBLE_THUMB_TEMPLATES[0].format(video_id)
                 logger.info(f'Generated fallback thumbnail URL: {thumbnail_url}')
             
             return {
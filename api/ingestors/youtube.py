@@ -1,99 +1,277 @@
 import re
+import json
+import atexit
+import asyncio
+import socket
+import threading
+import time
 import logging
-from typing import Dict, Any, Optional
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, Any, Optional, List
 from datetime import datetime
-from urllib.parse import urlparse, parse_qs
-import yt_dlp
+from urllib.parse import urlparse
+import orjson
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from .base import BaseIngestor
 
+if TYPE_CHECKING:
+    import yt_dlp
+
 logger = logging.getLogger(__name__)
 
+_DNS_TTL = 300
+_DNS_MAX_ENTRIES = 512
+_DNS_CACHE: Dict[tuple, tuple] = {}
+_DNS_LOCK = threading.Lock()
+# Only YouTube's own hosts are cached; database, redis, SMTP and other lookups keep the resolver's behaviour
+_DNS_CACHED_DOMAINS = ('youtube.com', 'youtu.be', 'googlevideo.com', 'ytimg.com', 'ggpht.com')
+
+def _dns_cacheable(host) -> bool:
+    if isinstance(host, bytes):
+        host = host.decode('ascii', 'ignore')
+    if not isinstance(host, str):
+        return False
+    host = host.lower().rstrip('.')
+    return any(host == domain or host.endswith('.' + domain) for domain in _DNS_CACHED_DOMAINS)
+
+def _install_dns_cache():
+    real_getaddrinfo = socket.getaddrinfo
+    if getattr(real_getaddrinfo, '_ttl_cached', False):
+        return
+    
+    def cached_getaddrinfo(host, port, family=0, type=0, proto=0, flags=0):
+        if not _dns_cacheable(host):
+            return real_getaddrinfo(host, port, family, type, proto, flags)
+        
+        key = (host, port, family, type, proto, flags)
+        now = time.monotonic()
+        entry = _DNS_CACHE.get(key)
+        if entry is not None and entry[0] > now:
+            return list(entry[1])
+        
+        result = real_getaddrinfo(host, port, family, type, proto, flags)
+        with _DNS_LOCK:
+            if len(_DNS_CACHE) >= _DNS_MAX_ENTRIES:
+                _DNS_CACHE.pop(next(iter(_DNS_CACHE)), None)
+            _DNS_CACHE[key] = (now + _DNS_TTL, result)
+        return list(result)
+    
+    cached_getaddrinfo._ttl_cached = True
+    socket.getaddrinfo = cached_getaddrinfo
+
+_install_dns_cache()
+
+_YT_RE = re.compile(
+    r'^https?://(?:www\.|m\.)?(?:youtube\.com/(?:watch\?(?:[^&]*&)*v=|embed/|v/|shorts/)|youtu\.be/)([A-Za-z0-9_-]{11})',
+    re.I,
+)
+
+_OEMBED_URL = "https://www.youtube.com/oembed"
+_WATCH_URL = "https://www.youtube.com/watch"
+_VIEW_COUNT_RE = re.compile(r'"viewCount":"(\d+)"')
+_LENGTH_SECONDS_RE = re.compile(r'"lengthSeconds":"(\d+)"')
+_PUBLISH_DATE_RE = re.compile(r'"publishDate":"([^"]+)"')
+_KEYWORDS_RE = re.compile(r'"keywords":(\[(?:"(?:[^"\\]|\\.)*",?)*\])')
+_CHANNEL_ID_RE = re.compile(r'"channelId":"([^"]+)"')
+_DESCRIPTION_RE = re.compile(r'"shortDescription":"((?:[^"\\]|\\.)*)"')
+
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504)),
+))
+_SESSION.headers.update({
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept-Language": "en-US,en;q=0.5",
+})
+
+class _NullLogger:
+    
+    def debug(self, msg):
+        pass
+    
+    def info(self, msg):
+        pass
+    
+    def warning(self, msg):
+        pass
+    
+    def error(self, msg):
+        pass
+
+class _TokenBucket:
+    
+    def __init__(self, rate: float, per: float = 1.0):
+        self.capacity = rate
+        self.tokens = rate
+        self.fill_rate = rate / per
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.fill_rate
+            time.sleep(wait)
+
+_BUCKET = _TokenBucket(rate=10, per=1.0)
+
+_EXTRACT_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="youtube_ydl")
+
+_yt_dlp = None
+
+def _load_yt_dlp():
+    global _yt_dlp
+    if _yt_dlp is None:
+        import yt_dlp
+        _yt_dlp = yt_dlp
+    return _yt_dlp
+
+# YoutubeDL keeps mutable per-run state (params, cookiejar, download counters), so each thread gets its own
+_YDL_LOCAL = threading.local()
+_YDL_INSTANCES: List[Any] = []
+_YDL_LOCK = threading.Lock()
+
+def _close_ydl():
+    with _YDL_LOCK:
+        for ydl in _YDL_INSTANCES:
+            ydl.close()
+        _YDL_INSTANCES.clear()
+
+atexit.register(_close_ydl)
+
 class YouTubeIngestor(BaseIngestor):
     
+    _YDL_OPTS = {
+        'quiet': True,
+        'no_warnings': True,
+        'extract_flat': 'in_playlist',
+        'skip_download': True,
+        'no_check_formats': True,
+        'no_check_certificate': True,
+        'socket_timeout': 10,
+        'retries': 0,
+        'ignoreerrors': False,
+        'no_color': True,
+        'youtube_include_dash_manifest': False,
+        'youtube_include_hls_manifest': False,
+        'extractor_args': {'youtube': {'player_client': ['web']}},
+        'noplaylist': True,
+        'playlistend': 1,
+        'geo_bypass': False,
+        'call_home': False,
+        'check_formats': False,
+        'logger': _NullLogger(),
+    }
+    
+    def __init__(self, redis_client=None, cache_ttl: int = 3600, stale_ttl: int = 7 * 24 * 3600, max_extract_seconds: float = 30.0):
+        self.redis = redis_client
+        self.max_extract_seconds = max_extract_seconds
+        self.cache_ttl = cache_ttl
+        self.stale_ttl = stale_ttl
+    
+    def _cache_get(self, video_id: Optional[str], stale: bool = False) -> Optional[Dict[str, Any]]:
+        if self.redis is None or not video_id:
+            return None
+        
+        key = f"yt:meta:stale:{video_id}" if stale else f"yt:meta:{video_id}"
+        try:
+            cached = self.redis.get(key)
+            return orjson.loads(cached) if cached else None
+        except Exception as e:
+            logger.warning(f"YouTube metadata cache read failed for {video_id}: {e}")
+            return None
+    
+    def _cache_set(self, video_id: Optional[str], info: Dict[str, Any]):
+        if self.redis is None or not video_id:
+            return
+        
+        try:
+            payload = orjson.dumps(info, default=str, option=orjson.OPT_NON_STR_KEYS)
+            pipe = self.redis.pipeline()
+            pipe.setex(f"yt:meta:{video_id}", self.cache_ttl, payload)
+            pipe.setex(f"yt:meta:stale:{video_id}", self.stale_ttl, payload)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"YouTube metadata cache write failed for {video_id}: {e}")
+    
+    def _get_ydl(self) -> "yt_dlp.YoutubeDL":
+        ydl = getattr(_YDL_LOCAL, 'ydl', None)
+        if ydl is None:
+            ydl = _load_yt_dlp().YoutubeDL(dict(self._YDL_OPTS))
+            _YDL_LOCAL.ydl = ydl
+            with _YDL_LOCK:
+                _YDL_INSTANCES.append(ydl)
+        return ydl
+    
+    def _ydl_extract_info(self, url: str) -> Optional[Dict[str, Any]]:
+        # Resolved on the pool thread so an instance is never shared with another in-flight extraction
+        return self._get_ydl().extract_info(url, download=False)
+    
     @property
     def platform(self) -> str:
         return "youtube"
     
     def can_handle(self, url: str) -> bool:
-        if not self.validate_url(url):
-            return False
-        
-        try:
-            parsed = urlparse(url.lower())
-            return (
-                'youtube.com' in parsed.netloc or 
-                'youtu.be' in parsed.netloc or
-                'm.youtube.com' in parsed.netloc
-            )
-        except:
-            return False
+        return isinstance(url, str) and _YT_RE.match(url) is not None
     
     def extract_video_id(self, url: str) -> Optional[str]:
-        try:
-            parsed = urlparse(url)
-            
-            if 'youtu.be' in parsed.netloc:
-                return parsed.path.lstrip('/')
-            
-            if 'youtube.com' in parsed.netloc:
-                if parsed.path == '/watch':
-                    return parse_qs(parsed.query).get('v', [None])[0]
-                elif parsed.path.startswith('/embed/'):
-                    return parsed.path.split('/embed/')[1].split('?')[0]
-                elif parsed.path.startswith('/v/'):
-                    return parsed.path.split('/v/')[1].split('?')[0]
-            
-            return None
-        except:
-            return None
+        match = _YT_RE.match(url) if isinstance(url, str) else None
+        return match.group(1) if match else None
     
-    def extract_metadata(self, url: str) -> Dict[str, Any]:
+    async def extract_metadata(self, url: str) -> Dict[str, Any]:
         if not self.can_handle(url):
             raise ValueError(f"Cannot handle URL: {url}")
         
-        ydl_opts = {
-            'quiet': True,
-            'no_warnings': True,
-            'extract_flat': False,
-            'skip_download': True,
-            'no_check_formats': True,
-            'no_check_certificate': True,
-            'socket_timeout': 10,
-            'retries': 0,
-            'fragment_retries': 0,
-            'ignoreerrors': False,
-            'no_color': True,
-            'extractaudio': False,
-            'writeautomaticsub': False,
-            'writesubtitles': False,
-            'writethumbnail': False,
-            'writeinfojson': False,
-            'writedescription': False,
-            'youtube_include_dash_manifest': False,
-            'youtube_include_hls_manifest': False,
-            'format': 'worst',
-            'noplaylist': True,
-            'playlistend': 1,
-            'geo_bypass': False,
-            'call_home': False,
-            'check_formats': False,
-        }
+        video_id = self.extract_video_id(url)
+        info = await asyncio.to_thread(self._extract_cached_or_fast, url, video_id)
+        if info is not None:
+            return info
         
+        loop = asyncio.get_running_loop()
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                logger.info(f"Extracting metadata for YouTube URL: {url}")
-                info = ydl.extract_info(url, download=False)
-                
-                if not info:
-                    raise ValueError("No metadata extracted - video may be private or deleted")
-                
-                logger.info(f"Successfully extracted metadata for video: {info.get('title', 'Unknown')}")
-                return info
-                
+            yt_dlp = _load_yt_dlp()
+            logger.debug("Extracting metadata for YouTube URL: %s", url)
+            try:
+                info = await asyncio.wait_for(
+                    loop.run_in_executor(_EXTRACT_POOL, self._ydl_extract_info, url),
+                    timeout=self.max_extract_seconds
+                )
+            except asyncio.TimeoutError:
+                # extract_info cannot be interrupted, so the worker keeps its pool slot until yt-dlp returns
+                logger.error(f"yt-dlp extraction timed out after {self.max_extract_seconds}s for {url}, abandoning the job")
+                raise ValueError("Extraction timed out")
+            
+            if not info:
+                raise ValueError("No metadata extracted - video may be private or deleted")
+            
+            logger.debug("Successfully extracted metadata for video: %s", info.get('title', 'Unknown'))
+            await asyncio.to_thread(self._cache_set, video_id, info)
+            return info
+            
+        except ImportError as e:
+            # Matched before DownloadError, whose clause needs the yt_dlp module to have loaded
+            logger.error(f"yt-dlp is unavailable for {url}: {e}")
+            raise ValueError(f"Metadata extraction failed: {str(e)}")
         except yt_dlp.DownloadError as e:
             error_msg = str(e)
             logger.error(f"yt-dlp download error for {url}: {e}")
             
+            stale = await asyncio.to_thread(self._cache_get, video_id, True)
+            if stale is not None:
+                logger.warning(f"Serving stale cached metadata for YouTube video: {video_id}")
+                return stale
+            
             if "private" in error_msg.lower():
                 raise ValueError("This video is private and cannot be accessed")
             elif "unavailable" in error_msg.lower():
@@ -104,108 +282,158 @@ class YouTubeIngestor(BaseIngestor):
                 raise ValueError("Request timed out - please try again")
             else:
                 raise ValueError(f"Could not access video: {error_msg}")
+        except ValueError:
+            raise
         except Exception as e:
             logger.error(f"Unexpected error extracting metadata for {url}: {e}")
             raise ValueError(f"Metadata extraction failed: {str(e)}")
     
+    def _extract_cached_or_fast(self, url: str, video_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        cached = self._cache_get(video_id)
+        if cached is not None:
+            logger.debug("Serving cached metadata for YouTube video: %s", video_id)
+            return cached
+        
+        _BUCKET.acquire()
+        
+        try:
+            info = self._fast_extract(url, video_id)
+        except Exception as e:
+            logger.warning(f"Fast YouTube extraction failed for {url}, falling back to yt-dlp: {e}")
+            return None
+        
+        self._cache_set(video_id, info)
+        return info
+    
+    def _fast_extract(self, url: str, video_id: str) -> Dict[str, Any]:
+        oembed = _SESSION.get(_OEMBED_URL, params={"url": url, "format": "json"}, timeout=5)
+        oembed.raise_for_status()
+        oembed_data = oembed.json()
+        
+        watch = _SESSION.get(_WATCH_URL, params={"v": video_id}, timeout=5)
+        watch.raise_for_status()
+        html = watch.text
+        
+        def find(pattern: re.Pattern) -> Optional[str]:
+            match = pattern.search(html)
+            return match.group(1) if match else None
+        
+        view_count = find(_VIEW_COUNT_RE)
+        length_seconds = find(_LENGTH_SECONDS_RE)
+        publish_date = find(_PUBLISH_DATE_RE)
+        keywords = find(_KEYWORDS_RE)
+        description = find(_DESCRIPTION_RE)
+        thumbnail_url = oembed_data.get('thumbnail_url')
+        
+        return {
+            'id': video_id,
+            'title': oembed_data.get('title', ''),
+            'uploader': oembed_data.get('author_name', ''),
+            'channel': oembed_data.get('author_name', ''),
+            'channel_id': find(_CHANNEL_ID_RE) or '',
+            'thumbnails': [{'url': thumbnail_url}] if thumbnail_url else [],
+            'description': json.loads(f'"{description}"') if description else '',
+            'upload_date': publish_date[:10].replace('-', '') if publish_date else None,
+            'duration': int(length_seconds) if length_seconds else None,
+            'view_count': int(view_count) if view_count else None,
+            'like_count': None,
+            'tags': json.loads(keywords) if keywords else [],
+            'extractor': 'oembed',
+        }
+    
+    async def extract_metadata_batch(self, urls: List[str], concurrency: int = 8) -> List[Any]:
+        semaphores: Dict[str, asyncio.Semaphore] = defaultdict(lambda: asyncio.Semaphore(concurrency))
+        
+        async def extract_one(url: str) -> Dict[str, Any]:
+            async with semaphores[urlparse(url).netloc.lower()]:
+                return await self.extract_metadata(url)
+        
+        # A failed URL comes back as its exception so it does not hide the other results
+        return await asyncio.gather(*(extract_one(url) for url in urls), return_exceptions=True)
+    
+    async def extract_and_normalize_batch(self, urls: List[str], concurrency: int = 8) -> List[Any]:
+        semaphores: Dict[str, asyncio.Semaphore] = defaultdict(lambda: asyncio.Semaphore(concurrency))
+        queue: asyncio.Queue = asyncio.Queue(maxsize=16)
+        results: List[Any] = [None] * len(urls)
+        
+        async def fetch(index: int, url: str):
+            try:
+                async with semaphores[urlparse(url).netloc.lower()]:
+                    raw_data = await self.extract_metadata(url)
+            except Exception as e:
+                raw_data = e
+            await queue.put((index, raw_data))
+        
+        async def produce():
+            await asyncio.gather(*(fetch(index, url) for index, url in enumerate(urls)))
+        
+        async def consume():
+            for _ in range(len(urls)):
+                index, raw_data = await queue.get()
+                if isinstance(raw_data, Exception):
+                    results[index] = raw_data
+                    continue
+                try:
+                    results[index] = self.normalize_metadata(raw_data)
+                except ValueError as e:
+                    results[index] = e
+        
+        # Failures are stored in place of their result, same as extract_metadata_batch
+        await asyncio.gather(produce(), consume())
+        return results
+    
     def normalize_metadata(self, raw_data: Dict[str, Any]) -> Dict[str, Any]:
         try:
+            g = raw_data.get
+            video_id = (g('id') or '').strip()
+            if not video_id:
+                raise ValueError("No video ID found in metadata")
+            
+            title = (g('title') or '').strip()
+            uploader = (g('uploader') or '').strip()
+            channel = (g('channel') or '').strip()
+            channel_id = (g('channel_id') or '').strip()
+            
+            upload_date = str(g('upload_date') or '')
             published_at = None
-            if raw_data.get('upload_date'):
+            if len(upload_date) == 8 and upload_date.isdigit():
                 try:
-                    upload_date_str = str(raw_data['upload_date'])
-                    published_at = datetime.strptime(upload_date_str, '%Y%m%d')
-                except (ValueError, TypeError):
-                    pass
-            
-            thumbnail_url = None
-            if raw_data.get('thumbnails'):
-                thumbnails = raw_data['thumbnails']
-                if thumbnails:
-                    thumbnail_url = thumbnails[-1].get('url')
+                    published_at = datetime(int(upload_date[:4]), int(upload_date[4:6]), int(upload_date[6:8]))
+                except ValueError:
+                    # Zero or out-of-range parts (e.g. '20240000') leave the date unset rather than failing
+                    published_at = None
             
-            video_id = raw_data.get('id', '').strip()
-            if not thumbnail_url and video_id:
+            thumbnails = g('thumbnails')
+            thumbnail_url = thumbnails[-1].get('url') if thumbnails else None
+            if not thumbnail_url:
                 thumbnail_url = f"https://img.youtube.com/vi/{video_id}/hqdefault.jpg"
             
-            description = raw_data.get('description', '')
-            if description:
-                description = description.strip()
-                if len(description) > 2000:
-                    description = description[:2000] + '...'
+            raw_description = g('description') or ''
+            if len(raw_description) > 2000:
+                description = raw_description[:2000].strip() + '...'
             else:
-                description = None
+                description = raw_description.strip() or None
             
-            tags = raw_data.get('tags', [])
-            if isinstance(tags, list) and tags:
-                tags = [str(tag)[:50] for tag in tags[:15]]
-            else:
-                tags = []
+            tags = [str(tag)[:50] for tag in (g('tags') or ())[:15]]
             
             normalized = {
-                "title": (raw_data.get('title', '').strip()[:500]) or None,
-                "author": (raw_data.get('uploader', '').strip()[:255] or 
-                          raw_data.get('channel', '').strip()[:255]) or None,
+                "title": title[:500] or None,
+                "author": uploader[:255] or channel[:255] or None,
                 "thumbnail_url": thumbnail_url,
                 "description": description,
                 "published_at": published_at,
                 "platform_specific": {
-                    "video_id": raw_data.get('id', '').strip(),
-                    "channel_id": raw_data.get('channel_id', '').strip() or None,
-                    "duration_seconds": raw_data.get('duration'),
-                    "view_count": raw_data.get('view_count'),
-                    "like_count": raw_data.get('like_count'),
+                    "video_id": video_id,
+                    "channel_id": channel_id or None,
+                    "duration_seconds": g('duration'),
+                    "view_count": g('view_count'),
+                    "like_count": g('like_count'),
                     "tags": tags,
                 }
             }
             
-            if not normalized["platform_specific"]["video_id"]:
-                raise ValueError("No video ID found in metadata")
-            
             return normalized
             
         except Exception as e:
             logger.error(f"Error normalizing YouTube metadata: {e}")
-            raise ValueError(f"Failed to normalize metadata: {str(e)}")
-
-class TikTokIngestor(BaseIngestor):
-    @property
-    def platform(self) -> str:
-        return "tiktok"
-    
-    def can_handle(self, url: str) -> bool:
-        return 'tiktok.com' in url.lower()
-    
-    def extract_metadata(self, url: str) -> Dict[str, Any]:
-        raise NotImplementedError("TikTok ingestion not implemented yet")
-    
-    def normalize_metadata(self, raw_data: Dict[str, Any]) -> Dict[str, Any]:
-        raise NotImplementedError("TikTok normalization not implemented yet")
-
-class InstagramIngestor(BaseIngestor):
-    @property
-    def platform(self) -> str:
-        return "instagram"
-    
-    def can_handle(self, url: str) -> bool:
-        return 'instagram.com' in url.lower()
-    
-    def extract_metadata(self, url: str) -> Dict[str, Any]:
-        raise NotImplementedError("Instagram ingestion not implemented yet")
-    
-    def normalize_metadata(self, raw_data: Dict[str, Any]) -> Dict[str, Any]:
-        raise NotImplementedError("Instagram normalization not implemented yet")
-
-class TwitterIngestor(BaseIngestor):
-    @property
-    def platform(self) -> str:
-        return "twitter"
-    
-    def can_handle(self, url: str) -> bool:
-        return 'twitter.com' in url.lower() or 'x.com' in url.lower()
-    
-    def extract_metadata(self, url: str) -> Dict[str, Any]:
-        raise NotImplementedError("Twitter ingestion not implemented yet")
-    
-    def normalize_metadata(self, raw_data: Dict[str, Any]) -> Dict[str, Any]:
-        raise NotImplementedError("Twitter normalization not implemented yet") 
\ No newline at end of file
+            raise ValueError(f"Failed to normalize metadata: {str(e)}")
\ No newline at end of file
@@ -1,16 +1,26 @@
-from fastapi import FastAPI, HTTPException, Depends, status, Query
+from fastapi import FastAPI, HTTPException, Depends, status, Query, Body
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, HttpUrl
-from sqlalchemy.orm import Session
-from sqlalchemy import text
-from datetime import timedelta
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, ConfigDict, HttpUrl, TypeAdapter, ValidationError
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import text, insert, select
+from sqlalchemy.exc import IntegrityError
+from datetime import datetime, timedelta, timezone
 from typing import Optional, List
+import asyncio
+import csv
+import io
+import itertools
 import logging
-import json
+import orjson
 
-from db import get_db, init_db
+from db import get_db, init_db, fts_enabled, read_engine, SessionLocal
 from models import User, Bookmark
-from ingestors import add_bookmark
+from ingestors import add_bookmark, detect_platform
+from ingestors.platforms import platform_cache_info, platform_for_host
+from ingestors.registry import close_browsers, close_writer
+from http_client import close_client
 from email_validation import validate_email_comprehensive
 from auth import (
     authenticate_user, 
@@ -25,34 +35,46 @@ from auth import (
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Sava Bookmark API", version="2.0.0")
+app = FastAPI(title="Sava Bookmark API", version="2.0.0", default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["http://localhost:3000", "http://127.0.0.1:3000", "http://localhost:3001", "http://127.0.0.1:3001", "http://localhost:3002", "http://127.0.0.1:3002"],
     allow_origin_regex=r"http://(localhost|127\.0\.0\.1):\d+",
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
+COPY_THRESHOLD = 100
+STREAM_BATCH = 200
+
 class BookmarkIn(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore")
+    
     url: HttpUrl
     title: str | None = None
     note: str | None = None
 
 class BookmarkUpdate(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore")
+    
     note: str | None = None
     title: str | None = None
 
 class YouTubeBookmarkIn(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore")
+    
     url: HttpUrl
 
 class UserRegister(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore")
+    
     email: str
     password: str
 
 class UserLogin(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore")
+    
     email: str
     password: str
 
@@ -60,30 +82,34 @@ class Token(BaseModel):
     access_token: str
     token_type: str
 
+# Validates a whole bulk payload in one pass through pydantic-core
+_BOOKMARK_LIST = TypeAdapter(List[BookmarkIn])
+
 @app.on_event("startup")
 def on_startup():
     init_db()
     logger.info("Sava API started successfully")
 
-def detect_platform(url: str) -> str:
-    u = url.lower()
-    if "tiktok.com" in u: return "tiktok"
-    if "youtube.com" in u or "youtu.be" in u: return "youtube"
-    if "instagram.com" in u: return "instagram"
-    if "twitter.com" in u or "x.com" in u: return "twitter"
-    if "linkedin.com" in u: return "linkedin"
-    if "reddit.com" in u: return "reddit"
-    if "pinterest.com" in u or "pin.it" in u: return "pinterest"
-    if "snapchat.com" in u: return "snapchat"
-    if "facebook.com" in u or "fb.com" in u: return "facebook"
-    return "other"
+@app.on_event("shutdown")
+async def on_shutdown():
+    await asyncio.to_thread(close_writer)
+    await close_browsers()
+    await close_client()
 
 @app.get("/")
 def health():
     return {"message": "Sava API is running 🚀", "version": "2.0.0"}
 
+@app.get("/debug/platform-cache", include_in_schema=False)
+def platform_cache():
+    return platform_cache_info()._asdict()
+
 @app.post("/auth/register", response_model=dict)
-def register(user: UserRegister, db: Session = Depends(get_db)):
+async def register(user: UserRegister, db: Session = Depends(get_db)):
+    # Email validation, bcrypt and the insert all block, so they run off the event loop together
+    return await asyncio.to_thread(_register_user, user, db)
+
+def _register_user(user: UserRegister, db: Session) -> dict:
     normalized_email = user.email.strip().lower()
     
     is_valid, error_message = validate_email_comprehensive(user.email)
@@ -93,24 +119,34 @@ def register(user: UserRegister, db: Session = Depends(get_db)):
             detail=error_message
         )
     
-    existing = db.query(User).filter(User.email == normalized_email).first()
-    if existing:
+    existing = db.scalar(select(User.id).where(User.email == normalized_email))
+    if existing is not None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
     hashed_password = get_password_hash(user.password)
-    new_user = User(email=normalized_email, password_hash=hashed_password)
     
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    try:
+        new_id = db.scalar(
+            insert(User).values(email=normalized_email, password_hash=hashed_password).returning(User.id)
+        )
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
     
-    return {"id": new_user.id, "email": new_user.email, "message": "User created successfully"}
+    return {"id": new_id, "email": normalized_email, "message": "User created successfully"}
 
 @app.post("/auth/login", response_model=Token)
-def login(user: UserLogin):
+async def login(user: UserLogin):
+    return await asyncio.to_thread(_login_user, user)
+
+def _login_user(user: UserLogin) -> dict:
     existing_user = get_user_by_email(user.email)
     if not existing_user:
         raise HTTPException(
@@ -139,9 +175,15 @@ def get_me(current_user: dict = Depends(get_current_user)):
     }
 
 @app.get("/users")
-def list_users(db: Session = Depends(get_db)):
-    users = db.query(User).order_by(User.created_at.desc()).all()
-    return [{"id": u.id, "email": u.email, "created_at": u.created_at} for u in users]
+async def list_users():
+    return await asyncio.to_thread(_list_users)
+
+def _list_users() -> List[dict]:
+    with read_engine.connect() as conn:
+        rows = conn.execute(
+            select(User.id, User.email, User.created_at).order_by(User.created_at.desc())
+        ).mappings().all()
+    return [dict(row) for row in rows]
 
 @app.post("/api/bookmarks/youtube")
 async def create_youtube_bookmark(
@@ -151,14 +193,15 @@ async def create_youtube_bookmark(
 ):
     try:
         url = str(bookmark_data.url)
+        host = bookmark_data.url.host or ""
         
-        if not ("youtube.com" in url.lower() or "youtu.be" in url.lower()):
+        if platform_for_host(host) != "youtube":
             raise HTTPException(
                 status_code=422,
                 detail="URL must be a valid YouTube URL"
             )
         
-        result = await add_bookmark(url, current_user["id"], db)
+        result = await add_bookmark(url, current_user["id"], db, host=host)
         
         logger.info(f"Successfully created YouTube bookmark: {result.get('title', 'Unknown')}")
         return result
@@ -182,20 +225,7 @@ async def create_bookmark(
 ):
     try:
         url = str(b.url)
-        result = await add_bookmark(url, current_user["id"], db)
-        
-        bookmark = db.query(Bookmark).filter(Bookmark.id == result["id"]).first()
-        if bookmark:
-            if b.title:
-                bookmark.title = b.title
-                result["title"] = b.title
-            if b.note:
-                bookmark.note = b.note
-                result["note"] = b.note
-            if b.title or b.note:
-                db.commit()
-        
-        return result
+        return await add_bookmark(url, current_user["id"], db, title=b.title, note=b.note, host=b.url.host or "")
         
     except ValueError as e:
         error_msg = str(e)
@@ -207,79 +237,226 @@ async def create_bookmark(
         logger.error(f"Error creating bookmark: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
-@app.get("/api/bookmarks")
-def list_bookmarks(
-    platform: Optional[str] = Query(None, description="Filter by platform (youtube, tiktok, instagram, twitter, linkedin, reddit, pinterest, snapchat, facebook, other)"),
-    q: Optional[str] = Query(None, description="Search query for title, author, or description"),
-    limit: int = Query(100, ge=1, le=500, description="Number of results to return"),
-    offset: int = Query(0, ge=0, description="Number of results to skip"),
+@app.post("/bookmarks/bulk")
+def create_bookmarks_bulk(
+    raw_items: list = Body(...),
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     try:
-        query = db.query(Bookmark).filter(Bookmark.user_id == current_user["id"])
-        
-        if platform:
-            platform_lower = platform.lower()
-            if platform_lower not in ['youtube', 'tiktok', 'instagram', 'twitter', 'linkedin', 'reddit', 'pinterest', 'snapchat', 'facebook', 'other']:
-                raise HTTPException(status_code=422, detail="Invalid platform")
-            query = query.filter(Bookmark.platform == platform_lower)
-        
-        if q:
-            search_term = f"%{q}%"
-            query = query.filter(
-                (Bookmark.title.ilike(search_term)) |
-                (Bookmark.author.ilike(search_term)) |
-                (Bookmark.description.ilike(search_term)) |
-                (Bookmark.note.ilike(search_term))
-            )
-        
-        bookmarks = query.order_by(Bookmark.created_at.desc()).offset(offset).limit(limit).all()
-        
-        results = []
-        for bookmark in bookmarks:
-            response = {
-                "id": bookmark.id,
-                "platform": bookmark.platform,
-                "url": bookmark.url,
-                "title": bookmark.title,
-                "author": bookmark.author,
-                "thumbnail_url": bookmark.thumbnail_url,
-                "note": bookmark.note,
-                "published_at": bookmark.published_at.isoformat() if bookmark.published_at else None,
-                "created_at": bookmark.created_at.isoformat(),
-                "meta": {}
+        items = _BOOKMARK_LIST.validate_python(raw_items)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+    
+    rows = {}
+    for item in items:
+        url = str(item.url)
+        if url not in rows:
+            rows[url] = {
+                "url": url,
+                "platform": detect_platform(url),
+                "title": item.title,
+                "note": item.note,
+                "user_id": current_user["id"],
             }
-            
-            if bookmark.platform == "youtube" and bookmark.youtube_details:
-                yt = bookmark.youtube_details[0]
-                response["meta"] = {
-                    "video_id": yt.video_id,
-                    "channel_id": yt.channel_id,
-                    "duration_seconds": yt.duration_seconds,
-                    "view_count": yt.view_count,
-                    "like_count": yt.like_count,
-                    "tags": json.loads(yt.tags) if yt.tags else []
-                }
-            
-            results.append(response)
+    
+    if not rows:
+        return {"created": [], "skipped": []}
+    
+    try:
+        existing = set(db.scalars(select(Bookmark.url).where(Bookmark.url.in_(list(rows)))))
+        new_rows = [row for url, row in rows.items() if url not in existing]
         
-        return results
+        created = []
+        if len(new_rows) >= COPY_THRESHOLD and db.bind.dialect.name == "postgresql":
+            created = _copy_bookmarks(db, new_rows)
+        elif new_rows:
+            created = list(db.scalars(insert(Bookmark).returning(Bookmark.id), new_rows))
+        db.commit()
         
-    except HTTPException:
-        raise
+        logger.info(f"Bulk imported {len(created)} bookmarks, skipped {len(existing)}")
+        return {"created": created, "skipped": sorted(existing)}
+        
+    except IntegrityError as e:
+        db.rollback()
+        logger.error(f"Bulk import conflict: {e}")
+        raise HTTPException(status_code=409, detail="Some of these links were bookmarked concurrently, please retry")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error bulk importing bookmarks: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+def _copy_bookmarks(db: Session, rows: List[dict]) -> List[int]:
+    now = datetime.now(timezone.utc).isoformat()
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter="\t", lineterminator="\n")
+    for row in rows:
+        writer.writerow([row["url"], row["title"], row["note"], row["platform"], row["user_id"], "{}", now, now])
+    buffer.seek(0)
+    
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            "COPY bookmarks (url, title, note, platform, user_id, raw, created_at, updated_at) "
+            "FROM STDIN WITH (FORMAT CSV, DELIMITER E'\\t')",
+            buffer
+        )
+    finally:
+        cursor.close()
+    
+    urls = [row["url"] for row in rows]
+    return list(db.scalars(select(Bookmark.id).where(Bookmark.url.in_(urls))))
+
+def _fts_query(q: str) -> str:
+    # Quote every term so user input cannot inject FTS5 operators, and prefix-match each one
+    return " ".join('"' + term.replace('"', '""') + '"*' for term in q.split())
+
+def _youtube_meta(bookmark: Bookmark) -> dict:
+    if bookmark.platform != "youtube" or not bookmark.youtube_details:
+        return {}
+    yt = bookmark.youtube_details[0]
+    return {
+        "video_id": yt.video_id,
+        "channel_id": yt.channel_id,
+        "duration_seconds": yt.duration_seconds,
+        "view_count": yt.view_count,
+        "like_count": yt.like_count,
+        "tags": yt.tags or []
+    }
+
+def _bookmark_to_dict(bookmark: Bookmark) -> dict:
+    return {
+        "id": bookmark.id,
+        "platform": bookmark.platform,
+        "url": bookmark.url,
+        "title": bookmark.title,
+        "author": bookmark.author,
+        "thumbnail_url": bookmark.thumbnail_url,
+        "note": bookmark.note,
+        "published_at": bookmark.published_at,
+        "created_at": bookmark.created_at,
+        "meta": _youtube_meta(bookmark)
+    }
+
+def _validate_platform(platform: Optional[str]) -> Optional[str]:
+    if not platform:
+        return None
+    platform_lower = platform.lower()
+    if platform_lower not in ['youtube', 'tiktok', 'instagram', 'twitter', 'linkedin', 'reddit', 'pinterest', 'snapchat', 'facebook', 'other']:
+        raise HTTPException(status_code=422, detail="Invalid platform")
+    return platform_lower
+
+def _bookmark_query(db: Session, user_id: int, platform: Optional[str] = None, q: Optional[str] = None):
+    query = db.query(Bookmark).options(selectinload(Bookmark.youtube_details)).filter(Bookmark.user_id == user_id)
+    
+    if platform:
+        query = query.filter(Bookmark.platform == platform)
+    
+    if q and fts_enabled() and q.split():
+        query = query.filter(
+            text("bookmarks.id IN (SELECT rowid FROM bookmarks_fts WHERE bookmarks_fts MATCH :match)")
+            .bindparams(match=_fts_query(q))
+        )
+    elif q:
+        search_term = f"%{q}%"
+        query = query.filter(
+            (Bookmark.title.ilike(search_term)) |
+            (Bookmark.author.ilike(search_term)) |
+            (Bookmark.description.ilike(search_term)) |
+            (Bookmark.note.ilike(search_term))
+        )
+    
+    return query.order_by(Bookmark.created_at.desc())
+
+@app.get("/api/bookmarks")
+async def list_bookmarks(
+    platform: Optional[str] = Query(None, description="Filter by platform (youtube, tiktok, instagram, twitter, linkedin, reddit, pinterest, snapchat, facebook, other)"),
+    q: Optional[str] = Query(None, description="Search query for title, author, or description"),
+    limit: int = Query(100, ge=1, le=500, description="Number of results to return"),
+    offset: int = Query(0, ge=0, description="Number of results to skip"),
+    current_user: dict = Depends(get_current_user)
+):
+    platform_lower = _validate_platform(platform)
+    user_id = current_user["id"]
+    
+    # The stream owns its session: request-scoped dependencies are torn down before the body is sent
+    def open_rows():
+        db = SessionLocal()
+        try:
+            rows = iter(
+                _bookmark_query(db, user_id, platform_lower, q)
+                .offset(offset)
+                .limit(limit)
+                .execution_options(stream_results=True)
+                .yield_per(STREAM_BATCH)
+            )
+            # Run the query and fetch the first batch before any bytes go out, so a failure is still a 500
+            first = next(rows, None)
+            return db, itertools.chain((first,), rows) if first is not None else iter(())
+        except Exception:
+            db.close()
+            raise
+    
+    try:
+        db, rows = await asyncio.to_thread(open_rows)
     except Exception as e:
         logger.error(f"Error listing bookmarks: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
+    
+    def stream():
+        try:
+            yield b"["
+            separator = b""
+            batch = []
+            for bookmark in rows:
+                batch.append(_bookmark_to_dict(bookmark))
+                if len(batch) == STREAM_BATCH:
+                    # One orjson call per fetched batch; strip the list brackets to splice into the array
+                    yield separator + orjson.dumps(batch)[1:-1]
+                    separator = b","
+                    batch = []
+            if batch:
+                yield separator + orjson.dumps(batch)[1:-1]
+            yield b"]"
+            
+        except Exception as e:
+            logger.error(f"Error listing bookmarks: {e}")
+            raise
+        finally:
+            db.close()
+    
+    return StreamingResponse(stream(), media_type="application/json")
+
+@app.get("/api/bookmarks/summary")
+async def bookmarks_summary(
+    platform: str = Query("youtube", description="Platform for the filtered listing"),
+    q: Optional[str] = Query(None, description="Search query for the search listing"),
+    limit: int = Query(100, ge=1, le=500, description="Number of results per listing"),
+    current_user: dict = Depends(get_current_user)
+):
+    platform_lower = _validate_platform(platform)
+    return await asyncio.to_thread(_bookmarks_summary, current_user["id"], platform_lower, q, limit)
+
+def _bookmarks_summary(user_id: int, platform: str, q: Optional[str], limit: int) -> dict:
+    # One HTTP round trip for the client; the three SELECTs (plus their selectinloads) are read-only, so skip the transaction
+    with Session(read_engine) as db:
+        try:
+            return {
+                "all": [_bookmark_to_dict(b) for b in _bookmark_query(db, user_id).limit(limit)],
+                platform: [_bookmark_to_dict(b) for b in _bookmark_query(db, user_id, platform=platform).limit(limit)],
+                "search": [_bookmark_to_dict(b) for b in _bookmark_query(db, user_id, q=q).limit(limit)] if q else [],
+            }
+        except Exception as e:
+            logger.error(f"Error building bookmark summary: {e}")
+            raise HTTPException(status_code=500, detail="Internal server error")
 
 @app.get("/bookmarks")
-def list_bookmarks_legacy(
+async def list_bookmarks_legacy(
     query: str | None = None, 
     platform: str | None = None,
-    current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: dict = Depends(get_current_user)
 ):
-    return list_bookmarks(platform=platform, q=query, current_user=current_user, db=db)
+    return await list_bookmarks(platform=platform, q=query, limit=100, offset=0, current_user=current_user)
 
 @app.delete("/api/bookmarks/{bookmark_id}")
 def delete_bookmark(
@@ -334,29 +511,7 @@ def update_bookmark(
         db.refresh(bookmark)
         
         # Return the updated bookmark in the same format as list_bookmarks
-        response = {
-            "id": bookmark.id,
-            "platform": bookmark.platform,
-            "url": bookmark.url,
-            "title": bookmark.title,
-            "author": bookmark.author,
-            "thumbnail_url": bookmark.thumbnail_url,
-            "note": bookmark.note,
-            "published_at": bookmark.published_at.isoformat() if bookmark.published_at else None,
-            "created_at": bookmark.created_at.isoformat(),
-            "meta": {}
-        }
-        
-        if bookmark.platform == "youtube" and bookmark.youtube_details:
-            yt = bookmark.youtube_details[0]
-            response["meta"] = {
-                "video_id": yt.video_id,
-                "channel_id": yt.channel_id,
-                "duration_seconds": yt.duration_seconds,
-                "view_count": yt.view_count,
-                "like_count": yt.like_count,
-                "tags": json.loads(yt.tags) if yt.tags else []
-            }
+        response = _bookmark_to_dict(bookmark)
         
         logger.info(f"Updated bookmark {bookmark_id}")
         return response
@@ -1,6 +1,6 @@
 from sqlalchemy import (
     Column, BigInteger, Integer, String, Text, DateTime, Boolean, 
-    ForeignKey, Index, CheckConstraint, func
+    ForeignKey, Index, CheckConstraint, JSON, func, text as sa_text
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.dialects.postgresql import JSONB, ARRAY
@@ -40,7 +40,7 @@ class Bookmark(Base):
     published_at = Column(DateTime(timezone=True))
     created_at = Column(DateTime(timezone=True), nullable=False, default=func.now())
     updated_at = Column(DateTime(timezone=True), nullable=False, default=func.now(), onupdate=func.now())
-    raw = Column(Text, nullable=False, default='{}')
+    raw = Column(Text, nullable=False, server_default=sa_text("'{}'"))
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     
     __table_args__ = (
@@ -48,9 +48,9 @@ class Bookmark(Base):
             "platform IN ('youtube','tiktok','instagram','twitter','linkedin','reddit','pinterest','snapchat','facebook','other')",
             name='check_platform_values'
         ),
-        Index('idx_bookmarks_platform_created_at', 'platform', 'created_at'),
+        Index('idx_bookmarks_user_platform_created', 'user_id', 'platform', created_at.desc()),
         Index('idx_bookmarks_raw_gin', 'raw', postgresql_using='gin'),
-        Index('idx_bookmarks_user_created', 'user_id', 'created_at'),
+        Index('idx_bookmarks_user_created_desc', 'user_id', created_at.desc()),
     )
     
     user = relationship("User", back_populates="bookmarks")
@@ -65,8 +65,8 @@ class YouTubeDetails(Base):
     duration_seconds = Column(Integer)
     view_count = Column(Integer)
     like_count = Column(Integer)
-    tags = Column(Text)
-    extra = Column(Text, nullable=False, default='{}')
+    tags = Column(JSON().with_variant(JSONB, "postgresql"))
+    extra = Column(Text, nullable=False, server_default=sa_text("'{}'"))
     
     __table_args__ = (
         Index('idx_youtube_video_id', 'video_id', unique=True),
@@ -100,7 +100,7 @@ class Comment(Base):
     text = Column(Text, nullable=False)
     like_count = Column(Integer, default=0)
     created_at = Column(DateTime(timezone=True), nullable=False, default=func.now())
-    raw = Column(Text, nullable=False, default='{}')
+    raw = Column(Text, nullable=False, server_default=sa_text("'{}'"))
     
     __table_args__ = (
         Index('idx_comments_bookmark_created', 'bookmark_id', 'created_at'),
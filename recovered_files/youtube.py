@@ -34,6 +34,7 @@
   opacity: 0; 
   transform: translateY(20px); 
   transition: opacity 0.8s cubic-bezier(0.4, 0, 0.2, 1), transform 0.8s cubic-bezier(0.4, 0, 0.2, 1); 
+  will-change: opacity, transform;
 }
 [data-reveal].is-visible { 
   opacity: 1; 
@@ -55,8 +56,8 @@ body {
 }
 
 .card-elevated {
-  border: 1px solid var(--border);
-  background: var(--surface);
+  border: 1px solid #e5e7eb;
+  background: #ffffff;
   border-radius: 1rem;
   box-shadow: 0 10px 30px rgba(0,0,0,0.06);
 }
@@ -198,10 +199,6 @@ body {
   text-shadow: 0 2px 4px rgba(0,0,0,0.1);
 }
 
-* {
-  transition-timing-function: cubic-bezier(0.4, 0, 0.2, 1);
-}
-
 /* Removed default focus outline */
 button:focus-visible,
 input:focus-visible {
@@ -2,20 +2,25 @@
 
 import sys
 import os
-from pathlib import Path
 
-api_dir = Path(__file__).parent / "api"
-sys.path.insert(0, str(api_dir))
+api_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "api")
+sys.path.insert(0, api_dir)
 
-if __name__ == "__main__":
+def main():
     import uvicorn
     
-    os.chdir(api_dir)
+    # The file-watching reloader is a dev convenience; production runs prefork workers instead
+    reload = bool(os.environ.get("SAVA_DEV"))
     
     uvicorn.run(
         "main:app",
+        app_dir=api_dir,
         host="0.0.0.0",
         port=8000,
-        reload=True,
-        reload_dirs=[str(api_dir)]
-    ) 
\ No newline at end of file
+        reload=reload,
+        reload_dirs=[api_dir] if reload else None,
+        workers=1 if reload else int(os.environ.get("SAVA_WORKERS", os.cpu_count() or 2))
+    )
+
+if __name__ == "__main__":
+    main()
@@ -455,8 +455,11 @@ export default function Home() {
     const obs = new IntersectionObserver((entries) => {
       entries.forEach((entry) => {
         if (entry.isIntersecting) {
-          entry.target.classList.add("is-visible");
-          obs.unobserve(entry.target);
+          const el = entry.target as HTMLElement;
+          el.classList.add("is-visible");
+          // Drop the compositor layer once the reveal has settled
+          el.addEventListener("transitionend", () => { el.style.willChange = "auto"; }, { once: true });
+          obs.unobserve(el);
         }
       });
     }, { threshold: 0.1 });